@@ -0,0 +1,204 @@
+"""Reading of the transliterations of ATF files as readings in the spelling of
+the compositions.
+
+Only the transliteration lines, those starting with a label such as 1. or
+3'., are read; the other lines (headers, comments, structure, translations)
+are skipped.  Each word is split into its signs, at -, ., +, :, and around
+determinatives and phonetic complements in braces, and each sign is
+normalized to our spelling: lowercase, š for sz and c, ṣ for s,, ṭ for t,, ḫ
+for h, ŋ for ĝ, j for y, ʾ for ', digits for subscripts, and x for ₓ.  The j
+of ORACC’s ASCII ATF, which is our ŋ, is not supported, since our j is the
+glide, as in aja.  Numbers such as 3(diš), 2(u), or 1(bur₃) become
+3, 20, and 1bur3.  The flags and brackets of damage and collation are
+ignored, as are the signs that an editor supplied; the sign name in
+parentheses after a reading, as in duₓ(KUD) or šu!(LU), is kept as its
+qualifier.
+"""
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import os
+import pickle
+import re
+
+# The extensions of the files read by the corpus tools.
+ATF_EXTENSIONS = (".atf",)
+
+Token = collections.namedtuple(
+    "Token", ("line_number", "word", "reading", "qualifier"))
+
+LABEL = re.compile(r"^(\S*\d\S*)\.\s+(.*)$")
+
+# Inline comments, and signs supplied by the editor, which are not on the
+# tablet.
+OMITTED = re.compile(r"\(\$.*?\$\)|(?<!<)<(?!<)[^<>]*>(?!>)")
+
+# The flags, brackets, and markers that do not change the reading.
+IGNORED = str.maketrans("", "", "[]⸢⸣˹˺#!?*<>")
+
+SIGN_SEPARATORS = re.compile(r"[-.+:]|(?=\{)|(?<=\})")
+
+NUMBER = re.compile(r"^(\d+(?:/\d+)?)\((.+)\)$")
+
+READING_WITH_QUALIFIER = re.compile(r"^([^()]+)\((.+)\)$")
+
+ASCII_TO_UNICODE = (("sz", "š"), ("s,", "ṣ"), ("t,", "ṭ"), ("c", "š"),
+                    ("h", "ḫ"), ("ĝ", "ŋ"), ("g̃", "ŋ"), ("y", "j"),
+                    ("'", "ʾ"), ("ₓ", "x"))
+
+SUBSCRIPTS = str.maketrans("₀₁₂₃₄₅₆₇₈₉", "0123456789")
+
+
+def normalize_reading(reading):
+  reading = reading.lower()
+  for ascii_spelling, spelling in ASCII_TO_UNICODE:
+    reading = reading.replace(ascii_spelling, spelling)
+  return reading.translate(SUBSCRIPTS)
+
+
+def number_reading(count, unit):
+  """The composition of the number count(unit), e.g., 20 for 2(u)."""
+  unit = normalize_reading(unit)
+  if unit == "diš":
+    return count
+  if unit == "u" and "/" not in count:
+    return str(int(count) * 10)
+  return count + unit
+
+
+def is_unreadable(sign):
+  # Broken or illegible signs, x, X, or ..., and unknown numbers, n.
+  return not sign or sign in ("n", "N") or set(sign) <= set("xX.…")
+
+
+def sign_readings(word):
+  """Yields the (reading, qualifier) of the signs of word; the reading is
+  None for an unreadable sign.  Compound sign names such as |GA₂×AN| are
+  given as readings as they are."""
+  for sign in SIGN_SEPARATORS.split(word.translate(IGNORED)):
+    sign = sign.strip("{}")
+    if sign.startswith("+"):
+      sign = sign[1:]
+    if not sign:
+      continue
+    if sign.startswith("|") or "×" in sign:
+      yield sign, None
+      continue
+    if is_unreadable(sign):
+      yield None, None
+      continue
+    number = NUMBER.match(sign)
+    if number:
+      yield number_reading(*number.groups()), None
+      continue
+    qualified = READING_WITH_QUALIFIER.match(sign)
+    if qualified:
+      yield normalize_reading(qualified[1]), qualified[2]
+      continue
+    yield normalize_reading(sign), None
+
+
+# The words of a corpus recur constantly, so their readings are memoized.
+@functools.lru_cache(maxsize=1 << 16)
+def word_readings(word):
+  return tuple(sign_readings(word))
+
+
+def transliteration_lines(file):
+  """Yields the (line number, transliteration) of the transliteration lines of
+  the ATF in file, an iterable of lines."""
+  for line_number, line in enumerate(file, 1):
+    match = LABEL.match(line)
+    if match and not line.startswith(("#", "$", "@", "&", "=", ">>")):
+      yield line_number, match[2]
+
+
+def read_words(path):
+  """Yields the (line number, word, (reading, qualifier) of each sign) of the
+  words of the ATF file at path."""
+  with open(path, encoding="utf-8", errors="replace") as file:
+    for line_number, text in transliteration_lines(file):
+      # Excised signs, in double angle brackets, are on the tablet.
+      text = OMITTED.sub(" ", text).replace("<<", "").replace(">>", "")
+      for word in text.split():
+        yield line_number, word, word_readings(word)
+
+
+def read_tokens(path):
+  """Yields the Tokens of the ATF file at path, one per sign."""
+  for line_number, word, readings in read_words(path):
+    for reading, qualifier in readings:
+      yield Token(line_number, word, reading, qualifier)
+
+
+def atf_files(paths):
+  """Returns the ATF files in paths, files or directories searched
+  recursively, sorted."""
+  files = []
+  for path in paths:
+    if os.path.isdir(path):
+      for directory, _, filenames in os.walk(path):
+        files += [os.path.join(directory, filename) for filename in filenames
+                  if filename.endswith(ATF_EXTENSIONS)]
+    else:
+      files.append(path)
+  return sorted(files)
+
+
+def code_key(*modules):
+  """A digest of the code of this module and of the given modules, for the
+  keys of caches of results computed from ATF files."""
+  key = hashlib.sha256()
+  for module in (__file__,) + tuple(module.__file__ for module in modules):
+    with open(module, "rb") as f:
+      key.update(hashlib.sha256(f.read()).digest())
+  return key.hexdigest()
+
+
+def file_state(path):
+  status = os.stat(path)
+  return status.st_size, status.st_mtime_ns
+
+
+def map_files(function, paths, jobs=1, cache_path=None, key=None):
+  """Returns the map from each of paths to function(path), and the list of the
+  paths for which it was computed rather than taken from the cache.  If jobs is
+  not 1, the files are processed in that many processes (as many as there are
+  cores if jobs is None), so function must be picklable, as must its results.
+  The results are cached at cache_path, if not None, under key, which should
+  identify function and its code (see code_key): only the files which are new,
+  or whose size or modification time changed, are processed again."""
+  cached = {}
+  if cache_path is not None:
+    try:
+      with open(cache_path, "rb") as f:
+        cache = pickle.load(f)
+      if cache["key"] == key:
+        cached = cache["files"]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+      pass
+  states = {path: file_state(path) for path in paths}
+  results = {path: cached[path][1] for path in paths
+             if path in cached and cached[path][0] == states[path]}
+  stale = [path for path in paths if path not in results]
+  if jobs == 1 or len(stale) < 2:
+    results.update(zip(stale, map(function, stale)))
+  else:
+    jobs = jobs or os.cpu_count()
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+      results.update(zip(stale, executor.map(
+          function, stale, chunksize=len(stale) // (4 * jobs) + 1)))
+  if cache_path is not None and stale:
+    # Files which no longer exist are forgotten; others, which may be those
+    # of another corpus, are kept.
+    files = {path: entry for path, entry in cached.items()
+             if os.path.exists(path)}
+    files.update((path, (states[path], results[path])) for path in stale)
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+      pickle.dump({"key": key, "files": files}, f,
+                  protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, cache_path)
+  return {path: results[path] for path in paths}, stale
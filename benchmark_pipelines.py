@@ -0,0 +1,127 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+
+import instrumentation
+import ogsl
+import sign_list
+import synthetic
+from diagnostics import Diagnostics
+
+
+def run_sign_list(path, diagnostics, profile):
+  readings = sign_list.read_šašková_readings(path, diagnostics=diagnostics,
+                                            profile=profile)
+  with profile.stage("compositions") as stage:
+    compositions = sign_list.build_compositions(readings, diagnostics)
+    stage["items"] = len(compositions)
+  return compositions
+
+
+PIPELINES = (
+    ("ogsl", "asl", synthetic.generate_asl, ogsl.read_compositions),
+    ("sign_list", "csv", synthetic.generate_sign_list_csv, run_sign_list),
+)
+
+
+def run_pipeline(run, path, trace_memory):
+  """Runs the pipeline on path with its output silenced, and returns its
+  profile and the number of diagnostics.  The synthetic inputs are
+  meaningless, so the OGSL fixups and checks report errors about them; those
+  are collected rather than raised."""
+  diagnostics = Diagnostics(collect_all=True)
+  profile = instrumentation.Profile(path, trace_memory=trace_memory)
+  with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+       contextlib.redirect_stderr(devnull):
+    run(path, diagnostics, profile)
+  return profile, len(diagnostics.diagnostics)
+
+
+def scaling_exponent(small, large):
+  """The exponent k such that the time grows as n^k from small to large,
+  which are (items, seconds); about 1 for a linear pass and 2 for a quadratic
+  one."""
+  (n1, t1), (n2, t2) = small, large
+  if not (n1 and n2 and t1 and t2) or n1 == n2:
+    return None
+  return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Runs both pipelines on synthetic inputs of increasing size, "
+                  "and reports the throughput and peak memory of each stage, "
+                  "and how its time scales with the size of the input.")
+  parser.add_argument("scales", nargs="*", type=int, default=[1, 10, 100],
+                      help="sizes of the inputs, as multiples of the real ones")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--pipeline", choices=[p[0] for p in PIPELINES],
+                      action="append",
+                      help="pipelines to run (all by default)")
+  parser.add_argument("--no-trace-memory", action="store_true",
+                      help="skip the second run of each pipeline, which "
+                           "traces the allocations to record the peak memory")
+  parser.add_argument("--json", metavar="PATH",
+                      help="write the measurements to PATH")
+  args = parser.parse_args()
+
+  results = []
+  with tempfile.TemporaryDirectory() as directory:
+    for name, extension, generate, run in PIPELINES:
+      if args.pipeline and name not in args.pipeline:
+        continue
+      for scale in sorted(args.scales):
+        path = os.path.join(directory, f"synthetic.{scale}.{extension}")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+          f.write(generate(scale, args.seed))
+        # The times are those of an untraced run, as tracing the allocations
+        # slows the stages unevenly.
+        timed, diagnostic_count = run_pipeline(run, path, trace_memory=False)
+        traced = (None if args.no_trace_memory else
+                  run_pipeline(run, path, trace_memory=True)[0])
+        stages = timed.report()["stages"]
+        if traced:
+          for stage, traced_stage in zip(stages, traced.report()["stages"]):
+            stage["peak_bytes"] = traced_stage["peak_bytes"]
+        results.append({"pipeline": name, "scale": scale,
+                        "input_bytes": os.path.getsize(path),
+                        "diagnostics": diagnostic_count,
+                        "stages": stages})
+        print(f"{name} ×{scale}: {os.path.getsize(path)} bytes, "
+              f"{diagnostic_count} diagnostics", file=sys.stderr)
+
+  print(f"{'pipeline':10}{'stage':20}{'scale':>6}{'items':>10}{'wall (s)':>10}"
+        f"{'items/s':>12}{'peak (MiB)':>12}{'exponent':>10}")
+  previous = {}
+  for result in results:
+    for stage in result["stages"]:
+      key = (result["pipeline"], stage["stage"])
+      current = (stage["items"], stage["wall_seconds"])
+      stage["scaling_exponent"] = (scaling_exponent(previous[key], current)
+                                   if key in previous else None)
+      previous[key] = current
+      rate = (f"{stage['items'] / stage['wall_seconds']:.0f}"
+              if stage["items"] and stage["wall_seconds"] else "")
+      peak = (f"{stage['peak_bytes'] / 2**20:.1f}"
+              if stage["peak_bytes"] is not None else "")
+      exponent = (f"{stage['scaling_exponent']:.2f}"
+                  if stage["scaling_exponent"] is not None else "")
+      print(f"{result['pipeline']:10}{stage['stage']:20}{result['scale']:>6}"
+            f"{stage['items'] or '':>10}{stage['wall_seconds']:>10.3f}"
+            f"{rate:>12}{peak:>12}{exponent:>10}")
+
+  if args.json:
+    with open(args.json, "w", encoding="utf-8") as f:
+      json.dump({"python": platform.python_version(),
+                 "platform": platform.platform(),
+                 "seed": args.seed,
+                 "results": results}, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import dictionary
+import snapshot
+
+# Each loader runs in a fresh interpreter, as it would in an editor plugin or a
+# batch converter, and prints the time taken by the import of its module and
+# the load, in nanoseconds.
+LOADER = """
+import time
+start = time.perf_counter_ns()
+import {module}
+compositions = {module}.{function}({path!r})
+print(time.perf_counter_ns() - start)
+"""
+
+LOADERS = (
+    ("text", dictionary.TEXT_DICTIONARIES[1][0],
+     "dictionary", "read_dictionary"),
+    ("json", dictionary.JSON_DICTIONARY, "dictionary", "read_dictionary"),
+    ("snapshot", snapshot.SNAPSHOT, "snapshot", "load_snapshot"),
+)
+
+
+def time_process(code):
+  """Returns the time taken by code in a fresh interpreter as measured by the
+  code itself, or None if it prints nothing, and the wall time of the process,
+  in milliseconds."""
+  start = time.perf_counter_ns()
+  output = subprocess.run([sys.executable, "-c", code], check=True,
+                          capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+  wall_time = (time.perf_counter_ns() - start) / 1e6
+  return (int(output) / 1e6 if output.strip() else None), wall_time
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Measures the time taken by a new process to load the "
+                  "dictionary in each of its formats.")
+  parser.add_argument("dictionary", nargs="?",
+                      default=os.path.join("Samples", "IME", "cpp", "SampleIME",
+                                           "Dictionary", "sign_list.txt"),
+                      help="dictionary from which to write the formats")
+  parser.add_argument("-n", "--runs", type=int, default=20,
+                      help="number of processes per format")
+  args = parser.parse_args()
+
+  compositions = dictionary.read_dictionary(args.dictionary)
+  with tempfile.TemporaryDirectory() as directory:
+    dictionary.write_dictionary(compositions, directory)
+    _, interpreter_time = zip(*(time_process("pass")
+                                for _ in range(args.runs)))
+    print(f"{len(compositions)} compositions, {args.runs} processes per "
+          f"format; interpreter startup "
+          f"{statistics.median(interpreter_time):.1f} ms")
+    print(f"{'format':10}{'size':>10}{'load (ms)':>12}{'process (ms)':>14}")
+    for name, filename, module, function in LOADERS:
+      path = os.path.join(directory, filename)
+      load_time, wall_time = zip(*(
+          time_process(LOADER.format(module=module, function=function,
+                                     path=path))
+          for _ in range(args.runs)))
+      print(f"{name:10}{os.path.getsize(path):>10}"
+            f"{statistics.median(load_time):>12.2f}"
+            f"{statistics.median(wall_time):>14.1f}")
+
+
+if __name__ == "__main__":
+  main()
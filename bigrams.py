@@ -0,0 +1,313 @@
+"""A bigram model of the compositions in a corpus of ATF transliterations, by
+which the input method may offer the likely next signs once a sign has been
+committed.
+
+The readings of each word of the corpus (see atf.py) are counted in pairs, the
+first sign of a word following the word boundary, so that the model also
+predicts the first sign of a word, such as the determinative d or m.  The
+readings which are not compositions of the dictionary are left out, and an
+unreadable sign interrupts the pairs.  Only the TOP most frequent successors
+of each reading are kept.
+
+The build writes the model to BIGRAMS, a little-endian binary file meant to be
+memory-mapped, made of a header (MAGIC, TOP, the number of readings including
+the boundary, the number of successors, and the length of the text of the
+readings, as unsigned 32-bit integers) followed by arrays of unsigned 32-bit
+integers:
+  reading_offsets  for each reading, the offset of its UTF-8 text in the text
+                   of the readings, and its end;
+  offsets          for each reading, the index of its first successor in the
+                   arrays below, and its end;
+  successors       the successors of each reading, by decreasing count;
+  counts           their counts;
+followed by the text of the readings, in lexicographic order, the boundary,
+the empty string, first.  Loading the model decodes nothing: a reading is found
+by bisecting the text of the readings in the map, and its successors are a
+slice whose bounds are read in constant time.
+"""
+import argparse
+import array
+import collections
+import mmap
+import os
+import struct
+import sys
+import time
+
+import atf
+import dictionary
+import prefixes
+
+BIGRAMS = "bigrams.bin"
+
+MAGIC = b"EBG1"
+HEADER = struct.Struct("<4sIIII")
+
+# The number of successors kept for each reading.
+TOP = 8
+
+# The reading that precedes the first sign of a word.
+BOUNDARY = ""
+
+CACHE_PATH = os.path.join(".cache", "bigrams", "counts.pickle")
+
+
+def count_file(path):
+  """Returns the Counter of the pairs of readings of the ATF file at path."""
+  pairs = collections.Counter()
+  for _, _, readings in atf.read_words(path):
+    previous = BOUNDARY
+    for reading, _ in readings:
+      if previous is not None and reading is not None:
+        pairs[previous, reading] += 1
+      previous = reading
+  return pairs
+
+
+def count_files(files, jobs=1, cache_path=CACHE_PATH):
+  """Returns the map from each of the ATF files to the Counter of its pairs of
+  readings, and the list of the files which were read rather than taken from
+  the cache at cache_path (see atf.map_files)."""
+  return atf.map_files(count_file, files, jobs, cache_path,
+                       atf.code_key(sys.modules[__name__]))
+
+
+def count_corpus(paths, jobs=1, cache_path=CACHE_PATH):
+  """Returns the Counter of the pairs of readings of the ATF files in paths,
+  as corpus_frequencies.count_corpus does for the readings."""
+  files = atf.atf_files(paths)
+  pairs_by_file, read = count_files(files, jobs, cache_path)
+  pairs = collections.Counter()
+  for file_pairs in pairs_by_file.values():
+    pairs.update(file_pairs)
+  return pairs, len(files), len(read)
+
+
+def build_model(pairs, compositions, top=TOP):
+  """Returns the bytes of the model of pairs, the Counter of the pairs of
+  readings of a corpus, keeping those of the compositions of compositions, and
+  the top most frequent successors of each reading."""
+  successors = {}
+  for (previous, reading), count in pairs.items():
+    if ((previous == BOUNDARY or previous in compositions) and
+        reading in compositions):
+      successors.setdefault(previous, []).append((-count, reading))
+  readings = sorted(set(successors) | set(
+      reading for pairs in successors.values() for _, reading in pairs) |
+                    {BOUNDARY})
+  ids = {reading: i for i, reading in enumerate(readings)}
+
+  text = bytearray()
+  reading_offsets = array.array("I", [0])
+  for reading in readings:
+    text += reading.encode("utf-8")
+    reading_offsets.append(len(text))
+  offsets = array.array("I", [0])
+  successor_ids = array.array("I")
+  counts = array.array("I")
+  for reading in readings:
+    for count, successor in sorted(successors.get(reading, ()))[:top]:
+      successor_ids.append(ids[successor])
+      counts.append(min(-count, 0xFFFFFFFF))
+    offsets.append(len(successor_ids))
+
+  data = bytearray(HEADER.pack(MAGIC, top, len(readings), len(successor_ids),
+                               len(text)))
+  for a in (reading_offsets, offsets, successor_ids, counts):
+    if sys.byteorder == "big":
+      a.byteswap()
+    data += a.tobytes()
+  return bytes(data + text)
+
+
+def write_model(model, directory):
+  """Writes the bytes of model to BIGRAMS in directory, and returns its
+  path."""
+  os.makedirs(directory, exist_ok=True)
+  path = os.path.join(directory, BIGRAMS)
+  dictionary.write_atomically(path, model)
+  return path
+
+
+class Model:
+  """The model in the bytes of data, e.g., a memory map of the file written
+  by write_model.  The arrays are views of data, except on big-endian hosts,
+  where they are byteswapped copies."""
+
+  def __init__(self, data):
+    magic, self.top, self.size, successors, text_length = HEADER.unpack_from(
+        data)
+    if magic != MAGIC:
+      raise ValueError(f"not a bigram model: {magic!r}")
+    view = memoryview(data)
+    position = HEADER.size
+
+    def integers(n):
+      nonlocal position
+      a = view[position:position + 4 * n]
+      position += 4 * n
+      if sys.byteorder == "big":
+        swapped = array.array("I")
+        swapped.frombytes(a)
+        swapped.byteswap()
+        return swapped
+      return a.cast("I")
+
+    self.reading_offsets = integers(self.size + 1)
+    self.offsets = integers(self.size + 1)
+    self.successors = integers(successors)
+    self.counts = integers(successors)
+    self.text = view[position:position + text_length]
+
+  def reading_text(self, i):
+    """The UTF-8 text of the reading i."""
+    return bytes(
+        self.text[self.reading_offsets[i]:self.reading_offsets[i + 1]])
+
+  def reading(self, i):
+    return self.reading_text(i).decode("utf-8")
+
+  def reading_id(self, reading):
+    """Returns the index of reading, found by bisection, or None."""
+    key = reading.encode("utf-8")
+    low, high = 0, self.size
+    while low < high:
+      middle = (low + high) // 2
+      if self.reading_text(middle) < key:
+        low = middle + 1
+      else:
+        high = middle
+    return low if low < self.size and self.reading_text(low) == key else None
+
+  @staticmethod
+  def load(path):
+    """Returns the Model of the file at path, memory-mapped."""
+    with open(path, "rb") as f:
+      return Model(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+  def predict(self, previous=BOUNDARY, k=None):
+    """Returns the list of the (composition, count) of the k (at most TOP)
+    most frequent successors of the composition previous, or of the first
+    signs of words if previous is BOUNDARY."""
+    i = self.reading_id(previous)
+    if i is None:
+      return []
+    start = self.offsets[i]
+    end = self.offsets[i + 1] if k is None else min(self.offsets[i + 1],
+                                                    start + k)
+    return [(self.reading(self.successors[j]), self.counts[j])
+            for j in range(start, end)]
+
+
+def evaluate(model, pairs, compositions):
+  """Returns the statistics of the entry of the signs of pairs, the Counter of
+  the pairs of readings of a corpus, with and without the predictions of
+  model: the proportion of signs which are the first prediction, and among the
+  predictions, and the keystrokes per sign.  Without predictions, a sign is
+  entered in the fewest keystrokes of prefixes.keystroke_statistics; the
+  prediction of rank r (0 for the first) is chosen in r + 1 keystrokes, moving
+  down the list, if that is fewer."""
+  table = prefixes.build_prefix_table(compositions)
+  signs = first = predicted = keystrokes = predicted_keystrokes = 0
+  predictions = {}
+  for (previous, reading), count in pairs.items():
+    if reading not in table:
+      continue
+    cost = prefixes.entry_keystrokes(reading, table[reading])["best"]
+    if previous not in predictions:
+      predictions[previous] = [composition for composition, _
+                               in model.predict(previous)]
+    rank = (predictions[previous].index(reading)
+            if reading in predictions[previous] else None)
+    signs += count
+    keystrokes += count * cost
+    if rank is not None:
+      predicted += count
+      first += count if rank == 0 else 0
+      predicted_keystrokes += count * min(cost, rank + 1)
+    else:
+      predicted_keystrokes += count * cost
+  return {"signs": signs,
+          "first_prediction": first / signs if signs else 0,
+          "predicted": predicted / signs if signs else 0,
+          "keystrokes_per_sign": keystrokes / signs if signs else 0,
+          "predicted_keystrokes_per_sign":
+              predicted_keystrokes / signs if signs else 0}
+
+
+def benchmark(model, contexts, repeat=10):
+  """Returns the mean time in seconds of model.predict for each of contexts."""
+  start = time.perf_counter()
+  for _ in range(repeat):
+    for context in contexts:
+      model.predict(context)
+  return (time.perf_counter() - start) / (repeat * len(contexts))
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Learns the bigram model of the compositions of the "
+                  "dictionary from the ATF files at the given paths, holding "
+                  "out one file in ten (at least one) for evaluation, and "
+                  "prints the proportion "
+                  "of signs predicted, the keystrokes saved, and the cost of a "
+                  "prediction.  Optionally writes the model learnt from every "
+                  "file.")
+  parser.add_argument("paths", nargs="+", metavar="path",
+                      help="ATF files, or directories searched for them")
+  parser.add_argument("--dictionary",
+                      default=os.path.join("Samples", "IME", "cpp",
+                                           "SampleIME", "Dictionary",
+                                           "sign_list.txt"),
+                      help="the dictionary, in any of its formats")
+  parser.add_argument("-o", "--output-directory",
+                      help="directory in which to write " + BIGRAMS)
+  parser.add_argument("--top", type=int, default=TOP,
+                      help="the number of successors kept for each reading")
+  parser.add_argument("-j", "--jobs", type=int, default=0,
+                      help="read the files in JOBS processes (one per core by "
+                           "default)")
+  parser.add_argument("--no-cache", action="store_true",
+                      help="read every file even if its counts are cached")
+  args = parser.parse_args()
+
+  compositions = dictionary.read_dictionary(args.dictionary)
+  files = atf.atf_files(args.paths)
+  start = time.perf_counter()
+  pairs_by_file, read = count_files(files, args.jobs or None,
+                                    None if args.no_cache else CACHE_PATH)
+  print(f"{len(files)} files ({len(read)} read) in "
+        f"{time.perf_counter() - start:.2f} s")
+  # Every tenth file is held out, or the last one if there are fewer than ten;
+  # a single file can only be evaluated on the data it was learnt from.
+  training, held_out = collections.Counter(), collections.Counter()
+  for i, path in enumerate(files):
+    held = i % 10 == 9 or (len(files) < 10 and i == len(files) - 1 and i > 0)
+    (held_out if held else training).update(pairs_by_file[path])
+
+  data = build_model(training, compositions, args.top)
+  model = Model(data)
+  statistics = evaluate(model, held_out or training, compositions)
+  print(f"{model.size} readings, {len(model.successors)} "
+        f"successors, {len(data)} bytes")
+  print(f"{statistics['signs']} signs "
+        f"{'held out' if held_out else 'of the training data'}: "
+        f"{statistics['first_prediction']:.1%} first prediction, "
+        f"{statistics['predicted']:.1%} among the predictions")
+  print(f"keystrokes per sign: {statistics['keystrokes_per_sign']:.2f} "
+        f"without predictions, "
+        f"{statistics['predicted_keystrokes_per_sign']:.2f} with them")
+  contexts = list(set(previous for previous, _ in held_out or training))
+  print(f"{benchmark(model, contexts) * 1e6:.2f} µs per prediction")
+
+  if args.output_directory:
+    path = write_model(build_model(training + held_out, compositions,
+                                   args.top), args.output_directory)
+    start = time.perf_counter()
+    Model.load(path)
+    print(f"{path}: {os.path.getsize(path)} bytes, loaded in "
+          f"{(time.perf_counter() - start) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,378 @@
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+
+import atf
+import bigrams
+import corpus_frequencies
+import dictionary
+import homophones
+import numerals
+import ogsl
+import prefixes
+import reconcile
+import sign_list
+import sign_records
+from diagnostics import Diagnostics
+
+# Bump whenever the layout of the cached results changes.
+CACHE_VERSION = 1
+
+CACHE_DIRECTORY = os.path.join(".cache", "build")
+
+DICTIONARY_DIRECTORY = os.path.join("Samples", "IME", "cpp", "SampleIME",
+                                    "Dictionary")
+
+
+class Stage:
+  """A stage of the build.  run(config, diagnostics, *dependency_results)
+  returns the result of the stage, which must be picklable; it is cached under
+  a key derived from the contents of the files named by inputs(config), the
+  code of the named modules, the values of the attributes settings of config,
+  and the keys of the dependencies.  If writes is true, the result is the map
+  from the paths written by the stage to the SHA-256 of their contents, and the
+  stage is run again if any of them has changed."""
+
+  def __init__(self, name, run, dependencies=(), inputs=lambda config: (),
+               modules=(), settings=(), writes=False):
+    self.name = name
+    self.run = run
+    self.dependencies = dependencies
+    self.inputs = inputs
+    self.modules = modules
+    self.settings = settings
+    self.writes = writes
+
+
+def file_digest(path):
+  with open(path, "rb") as f:
+    return hashlib.sha256(f.read()).hexdigest()
+
+
+def written_digests(paths):
+  return {path: file_digest(path) for path in paths}
+
+
+def build_numerals(config, diagnostics):
+  try:
+    numerals.validate()
+  except ValueError as e:
+    diagnostics.error("Numerals", e)
+  return dict(numerals.compositions)
+
+
+def parse_ogsl(config, diagnostics):
+  model = ogsl.parse_ogsl(config.ogsl, diagnostics)
+  ogsl.apply_fixups(model, diagnostics)
+  ogsl.check_unicode_names(model, diagnostics)
+  ogsl.check_values(model, diagnostics)
+  ogsl.check_coverage(model, diagnostics)
+  return model
+
+
+def build_ogsl(config, diagnostics, model, numeral_compositions):
+  return ogsl.build_compositions(model, diagnostics, numeral_compositions)
+
+
+def build_sign_list(config, diagnostics, numeral_compositions):
+  # The build cache supersedes the snapshot of the readings.
+  readings = sign_list.read_šašková_readings(config.sign_list,
+                                            diagnostics=diagnostics)
+  return sign_list.build_compositions(readings, diagnostics,
+                                      numeral_compositions)
+
+
+def write_ogsl_dictionary(config, diagnostics, compositions):
+  return written_digests(
+      dictionary.write_dictionary(compositions, config.ogsl_output_directory))
+
+
+def write_sign_list_dictionary(config, diagnostics, compositions):
+  return written_digests(
+      dictionary.write_dictionary(compositions,
+                                  config.sign_list_output_directory))
+
+
+def write_reconciliation(config, diagnostics, ogsl_compositions,
+                         sign_list_compositions):
+  merged, report = reconcile.reconcile(ogsl_compositions,
+                                       sign_list_compositions)
+  paths = dictionary.write_dictionary(merged,
+                                      config.reconciled_output_directory)
+  paths.append(os.path.join(config.reconciled_output_directory,
+                            "reconciliation.json"))
+  dictionary.write_atomically(
+      paths[-1], json.dumps(report, ensure_ascii=False, indent=1).encode("utf-8"))
+  return written_digests(paths)
+
+
+def write_sign_records(config, diagnostics, model, ogsl_compositions,
+                       sign_list_compositions):
+  records = sign_records.build_records(model, ogsl_compositions,
+                                       sign_list_compositions)
+  return written_digests([
+      sign_records.write_records(records, config.reconciled_output_directory)])
+
+
+def write_homophones(config, diagnostics, ogsl_compositions,
+                     sign_list_compositions):
+  return written_digests([homophones.write_homophones(
+      homophones.build_homophones({"ogsl": ogsl_compositions,
+                                   "šašková": sign_list_compositions}),
+      config.reconciled_output_directory)])
+
+
+def write_prefixes(config, diagnostics, compositions):
+  return written_digests([prefixes.write_prefixes(
+      prefixes.build_prefix_table(compositions),
+      config.ogsl_output_directory)])
+
+
+def write_frequencies(config, diagnostics, compositions):
+  if config.corpus is None:
+    return {}
+  counts, _, _ = corpus_frequencies.count_corpus([config.corpus],
+                                                 config.jobs or None)
+  return written_digests([corpus_frequencies.write_frequencies(
+      corpus_frequencies.composition_frequencies(counts, compositions),
+      config.ogsl_output_directory)])
+
+
+def write_bigrams(config, diagnostics, compositions):
+  if config.corpus is None:
+    return {}
+  pairs, _, _ = bigrams.count_corpus([config.corpus], config.jobs or None)
+  return written_digests([bigrams.write_model(
+      bigrams.build_model(pairs, compositions),
+      config.ogsl_output_directory)])
+
+
+def corpus_files(config):
+  return atf.atf_files([config.corpus]) if config.corpus else ()
+
+
+STAGES = {stage.name: stage for stage in (
+    Stage("numerals", build_numerals, modules=("numerals",)),
+    Stage("ogsl_model", parse_ogsl, inputs=lambda config: (config.ogsl,),
+          modules=("ogsl", "diagnostics")),
+    Stage("ogsl", build_ogsl, ("ogsl_model", "numerals"),
+          modules=("ogsl", "numerals", "diagnostics")),
+    Stage("sign_list", build_sign_list, ("numerals",),
+          inputs=lambda config: (config.sign_list,),
+          modules=("sign_list", "sign_list_rows", "numerals",
+                   "diagnostics")),
+    Stage("ogsl_dictionary", write_ogsl_dictionary, ("ogsl",),
+          modules=("dictionary",), settings=("ogsl_output_directory",),
+          writes=True),
+    Stage("sign_list_dictionary", write_sign_list_dictionary, ("sign_list",),
+          modules=("dictionary",), settings=("sign_list_output_directory",),
+          writes=True),
+    Stage("reconciliation", write_reconciliation, ("ogsl", "sign_list"),
+          modules=("reconcile", "dictionary"),
+          settings=("reconciled_output_directory",), writes=True),
+    Stage("sign_records", write_sign_records,
+          ("ogsl_model", "ogsl", "sign_list"),
+          modules=("sign_records", "ogsl", "reconcile", "dictionary"),
+          settings=("reconciled_output_directory",), writes=True),
+    Stage("prefixes", write_prefixes, ("ogsl",),
+          modules=("prefixes", "collation", "dictionary"),
+          settings=("ogsl_output_directory",), writes=True),
+    Stage("homophones", write_homophones, ("ogsl", "sign_list"),
+          modules=("homophones", "reconcile", "dictionary"),
+          settings=("reconciled_output_directory",), writes=True),
+    Stage("frequencies", write_frequencies, ("ogsl",), inputs=corpus_files,
+          modules=("corpus_frequencies", "atf", "reconcile", "collation",
+                   "dictionary"),
+          settings=("corpus", "ogsl_output_directory"), writes=True),
+    Stage("bigrams", write_bigrams, ("ogsl",), inputs=corpus_files,
+          modules=("bigrams", "atf", "dictionary"),
+          settings=("corpus", "ogsl_output_directory"), writes=True),
+)}
+
+
+def required_stages(targets):
+  """Returns the names of the targets and of the stages on which they depend,
+  dependencies first."""
+  order = []
+  def visit(name):
+    if name not in order:
+      for dependency in STAGES[name].dependencies:
+        visit(dependency)
+      order.append(name)
+  for target in targets:
+    visit(target)
+  return order
+
+
+def stage_key(stage, config, keys):
+  key = hashlib.sha256(f"{CACHE_VERSION} {stage.name}".encode("utf-8"))
+  for path in stage.inputs(config):
+    key.update(file_digest(path).encode("ascii"))
+  for module in stage.modules:
+    key.update(file_digest(sys.modules[module].__file__).encode("ascii"))
+  for setting in stage.settings:
+    key.update(repr(getattr(config, setting)).encode("utf-8"))
+  for dependency in stage.dependencies:
+    key.update(keys[dependency].encode("ascii"))
+  return key.hexdigest()
+
+
+def cache_path(cache_directory, name, key):
+  return os.path.join(cache_directory, f"{name}.{key[:16]}.pickle")
+
+
+def load_cached(stage, cache_directory, key):
+  """Returns the cached result of stage for key, or None."""
+  try:
+    with open(cache_path(cache_directory, stage.name, key), "rb") as f:
+      cached = pickle.load(f)
+  except (OSError, pickle.UnpicklingError, EOFError):
+    return None
+  if cached.get("key") != key:
+    return None
+  if stage.writes:
+    for path, digest in cached["result"].items():
+      if not os.path.exists(path) or file_digest(path) != digest:
+        return None
+  return cached
+
+
+def store_cached(stage, cache_directory, key, result):
+  os.makedirs(cache_directory, exist_ok=True)
+  dictionary.write_atomically(
+      cache_path(cache_directory, stage.name, key),
+      pickle.dumps({"key": key, "result": result},
+                   protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def run_stage(name, config, collect_all, dependency_results):
+  """Runs the stage name, and returns its result and the diagnostics it
+  recorded.  This runs in a worker process, where the stages are looked up by
+  name since they cannot be pickled."""
+  stage_diagnostics = Diagnostics(collect_all=collect_all)
+  result = STAGES[name].run(config, stage_diagnostics, *dependency_results)
+  return result, stage_diagnostics.diagnostics
+
+
+def build(targets, config, diagnostics, jobs=None,
+          cache_directory=CACHE_DIRECTORY, log=sys.stderr):
+  """Builds the given targets and the stages on which they depend, skipping
+  those whose cached results are up to date, and running independent stages
+  in up to jobs processes (as many as there are cores if jobs is None).
+  Returns the map from the name of each stage built to its result; a stage
+  that failed, or depends on one that did, has no result.  No caching happens
+  if cache_directory is None."""
+  order = required_stages(targets)
+  keys = {}
+  results = {}
+  for name in order:
+    keys[name] = stage_key(STAGES[name], config, keys)
+    cached = (load_cached(STAGES[name], cache_directory, keys[name])
+              if cache_directory is not None else None)
+    if cached is not None:
+      results[name] = cached["result"]
+      print(f"{name}: up to date", file=log)
+
+  pending = [name for name in order if name not in results]
+  failed = set()
+  executor = (concurrent.futures.ProcessPoolExecutor(jobs or os.cpu_count())
+              if jobs != 1 and len(pending) > 1 else None)
+  running = {}
+  try:
+    while pending or running:
+      for name in list(pending):
+        dependencies = STAGES[name].dependencies
+        if any(dependency in failed for dependency in dependencies):
+          pending.remove(name)
+          failed.add(name)
+          print(f"{name}: skipped", file=log)
+        elif all(dependency in results for dependency in dependencies):
+          pending.remove(name)
+          arguments = (name, config, diagnostics.collect_all,
+                       [results[dependency] for dependency in dependencies])
+          start = time.perf_counter()
+          if executor:
+            future = executor.submit(run_stage, *arguments)
+          else:
+            future = concurrent.futures.Future()
+            future.set_result(run_stage(*arguments))
+          running[future] = (name, start)
+      done, _ = concurrent.futures.wait(
+          running, return_when=concurrent.futures.FIRST_COMPLETED)
+      for future in done:
+        name, start = running.pop(future)
+        result, stage_diagnostics = future.result()
+        if stage_diagnostics:
+          diagnostics.diagnostics += stage_diagnostics
+          failed.add(name)
+          print(f"{name}: failed", file=log)
+          continue
+        results[name] = result
+        if cache_directory is not None:
+          store_cached(STAGES[name], cache_directory, keys[name], result)
+        print(f"{name}: built in {time.perf_counter() - start:.2f} s",
+              file=log)
+  finally:
+    if executor:
+      executor.shutdown(cancel_futures=True)
+  return results
+
+
+def argument_parser():
+  parser = argparse.ArgumentParser(
+      description="Builds the dictionaries, rebuilding only the stages whose "
+                  "inputs changed.  The stages are " + ", ".join(STAGES) + ".")
+  parser.add_argument("targets", nargs="*", metavar="stage",
+                      help="stages to build, with their dependencies (all by "
+                           "default)")
+  parser.add_argument("--ogsl",
+                      default=os.path.join("..", "ogsl", "00lib", "ogsl.asl"),
+                      help="the ogsl.asl file of a checkout of the OGSL")
+  parser.add_argument("--sign-list", default="sign_list.csv",
+                      help="the CSV export of the sign list of Šašková")
+  parser.add_argument("--corpus",
+                      help="a directory of ATF files from which to count the "
+                           "frequencies and bigrams of the compositions (none "
+                           "by default)")
+  parser.add_argument("--ogsl-output-directory", default=DICTIONARY_DIRECTORY,
+                      help="directory in which to write the OGSL dictionaries, "
+                           "prefixes.json, frequencies.tsv, and bigrams.bin")
+  parser.add_argument("--sign-list-output-directory", default=".",
+                      help="directory in which to write the Šašková "
+                           "dictionaries")
+  parser.add_argument("--reconciled-output-directory", default="reconciled",
+                      help="directory in which to write the merged "
+                           "dictionaries, reconciliation.json, "
+                           "sign_records.json, and homophones.json")
+  parser.add_argument("--all-errors", action="store_true",
+                      help="report every inconsistency instead of stopping at "
+                           "the first one")
+  parser.add_argument("--no-cache", action="store_true",
+                      help="run every stage even if its result is cached")
+  parser.add_argument("-j", "--jobs", type=int, default=0,
+                      help="run independent stages in JOBS processes (one per "
+                           "core by default)")
+  return parser
+
+
+def main():
+  parser = argument_parser()
+  args = parser.parse_args()
+  for target in args.targets:
+    if target not in STAGES:
+      parser.error(f"unknown stage {target}")
+  diagnostics = Diagnostics(collect_all=args.all_errors)
+
+  build(args.targets or list(STAGES), args, diagnostics, jobs=args.jobs or None,
+        cache_directory=None if args.no_cache else CACHE_DIRECTORY)
+  if diagnostics:
+    sys.exit(diagnostics.report())
+
+
+if __name__ == "__main__":
+  main()
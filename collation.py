@@ -0,0 +1,80 @@
+"""The order of the candidates of the input method, as in candidatesOrdered in
+mac/InputController.swift, of which valueKey and listKey are ports.
+
+The compositions are compared by their primary keys, then their secondary keys,
+then their variant numbers.  The secondary key of a value is the list of its
+words, alternately alphabetic, compared in the order of ALPHABET, and numeric,
+compared as numbers, so that a2 comes before a10, and ax after both.  The
+primary key was meant to ignore the aleph, but the Swift compares the alphabetic
+order with the scalar value of ʾ, so that it never does; we do the same, so
+as to rank the candidates as the input method does.
+"""
+import sys
+
+ALPHABET = "abdegŋḫijklmnpqrsṣšśtṭuwzʾ"
+ALPHABETICAL_ORDER = {c: i for i, c in enumerate(ALPHABET)}
+
+# Int.max in Swift.
+MAX_KEY = sys.maxsize
+
+VALUE_NUMERIC, FRACTION_SLASH, VALUE_ALPHABETIC, VARIANT = range(4)
+
+
+def value_key(s):
+  """Returns the (primary, secondary, variant) key of the value s."""
+  secondary = []
+  variant = 0
+  last_category = None
+  for c in s:
+    if c in ALPHABETICAL_ORDER:
+      if last_category != VALUE_ALPHABETIC:
+        secondary.append([])
+      secondary[-1].append(ALPHABETICAL_ORDER[c])
+      last_category = VALUE_ALPHABETIC
+    elif c.isdecimal():
+      if last_category == VARIANT:
+        variant = variant * 10 + int(c)
+      else:
+        if last_category == VALUE_NUMERIC:
+          secondary[-1][-1] *= 10
+        elif last_category == FRACTION_SLASH:
+          secondary[-1].append(0)
+        else:
+          secondary.append([0])
+        secondary[-1][-1] += int(c)
+        last_category = VALUE_NUMERIC
+    elif c == "x":
+      secondary.append([MAX_KEY])
+      last_category = VALUE_NUMERIC
+    elif c in "+-":
+      if last_category != VALUE_NUMERIC:
+        secondary.append([-1])
+        last_category = VALUE_NUMERIC
+      secondary[-1].append(0 if c == "-" else 1)
+    elif c == "/":
+      last_category = FRACTION_SLASH
+    elif c == "v":
+      last_category = VARIANT
+  primary = [[k for k in word if k != ord("ʾ")] for word in secondary]
+  return primary, secondary, variant
+
+
+def list_key(s):
+  """Returns the (primary, secondary, variant) key of the list number s, e.g.,
+  xmzl839 or xlak797v1; the name of the list is ignored."""
+  name_end = next(i for i, c in enumerate(s) if c.isdecimal())
+  number_end = next((i for i in range(name_end, len(s))
+                     if not s[i].isdecimal()), len(s))
+  tail_end = s.find("v", number_end)
+  if tail_end == -1:
+    tail_end = len(s)
+  primary = [[int(s[name_end:number_end])],
+             [ord(c) for c in s[number_end:tail_end]]]
+  variant = int(s[tail_end + 1:]) if tail_end < len(s) else 0
+  return primary, primary, variant
+
+
+def collation_key(composition):
+  """The key by which the input method orders the candidates."""
+  return (list_key(composition) if composition.startswith("x")
+          else value_key(composition))
@@ -0,0 +1,294 @@
+"""A local server answering queries about the dictionary, so that editors and
+tools share one warm copy of it instead of each loading and scanning the text
+dictionary.
+
+It speaks a minimal HTTP/1.1, with keep-alive, on localhost or on a Unix
+socket.  The queries are
+
+  GET /complete?prefix=ba&limit=20  the compositions starting with prefix,
+                                    in the order of the input method;
+  GET /exact?composition=ba         the sign for composition;
+  GET /reverse?sign=𒁀               the compositions of sign;
+  POST /batch                       a JSON list of queries, each an object
+                                    with "query" ("complete", "exact", or
+                                    "reverse") and the parameters above,
+                                    answered by a list of responses;
+  GET /metrics                      the number of requests and percentiles of
+                                    their latency, by query.
+
+The responses are JSON.  The dictionary is reloaded when its file changes, so
+that the server can run alongside watch.py.
+"""
+import argparse
+import asyncio
+import bisect
+import collections
+import heapq
+import json
+import os
+import sys
+import time
+import urllib.parse
+
+import collation
+import dictionary
+
+DICTIONARY_DIRECTORY = os.path.join("Samples", "IME", "cpp", "SampleIME",
+                                    "Dictionary")
+
+# The number of latencies kept per query for the percentiles.
+LATENCY_WINDOW = 10000
+
+STATUS_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 413: "Payload Too Large"}
+
+MAX_BODY_BYTES = 1 << 20
+
+
+class QueryError(Exception):
+  """An invalid query; status is the HTTP status of the response."""
+
+  def __init__(self, message, status=400):
+    super().__init__(message)
+    self.status = status
+
+
+class CompositionIndex:
+  """The compositions of a dictionary, sorted for prefix queries by bisection,
+  ranked in the order of the input method (see collation.py), and indexed by
+  sign."""
+
+  def __init__(self, compositions):
+    self.compositions = compositions
+    self.sorted_compositions = sorted(compositions)
+    self.ranks = {composition: rank for rank, composition in enumerate(
+        sorted(compositions, key=collation.collation_key))}
+    self.compositions_by_sign = {}
+    for composition in self.sorted_compositions:
+      self.compositions_by_sign.setdefault(compositions[composition],
+                                           []).append(composition)
+
+  def complete(self, prefix, limit=None):
+    """Returns the compositions starting with prefix, in the order of the
+    input method, as a list of (composition, sign), the first limit of them if
+    limit is not None."""
+    start = bisect.bisect_left(self.sorted_compositions, prefix)
+    end = bisect.bisect_left(self.sorted_compositions, prefix + "\U0010FFFF",
+                             start)
+    matches = self.sorted_compositions[start:end]
+    if limit is None:
+      matches.sort(key=self.ranks.__getitem__)
+    else:
+      matches = heapq.nsmallest(limit, matches, key=self.ranks.__getitem__)
+    return [(composition, self.compositions[composition])
+            for composition in matches]
+
+  def exact(self, composition):
+    return self.compositions.get(composition)
+
+  def reverse(self, sign):
+    return self.compositions_by_sign.get(sign, [])
+
+
+class LatencyMetrics:
+  """The count of requests and a window of their latencies, by query."""
+
+  def __init__(self, window=LATENCY_WINDOW):
+    self.started = time.time()
+    self.counts = collections.Counter()
+    self.latencies = collections.defaultdict(
+        lambda: collections.deque(maxlen=window))
+
+  def record(self, query, seconds):
+    self.counts[query] += 1
+    self.latencies[query].append(seconds)
+
+  def report(self):
+    def percentile(ordered, p):
+      return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+    queries = {}
+    for query, latencies in self.latencies.items():
+      ordered = sorted(latencies)
+      queries[query] = {
+          "requests": self.counts[query],
+          **{f"p{p}_ms": percentile(ordered, p) * 1e3 for p in (50, 90, 99)},
+          "max_ms": ordered[-1] * 1e3,
+      }
+    return {"uptime_seconds": time.time() - self.started, "queries": queries}
+
+
+class CompletionServer:
+  """Answers the queries described above from the dictionary at path, which
+  may be in any of the formats written by dictionary.write_dictionary."""
+
+  def __init__(self, path, reload_interval=1.0, log=sys.stderr):
+    self.path = path
+    self.reload_interval = reload_interval
+    self.log = log
+    self.metrics = LatencyMetrics()
+    self.load()
+
+  def load(self):
+    self.loaded_state = os.stat(self.path).st_mtime_ns
+    start = time.perf_counter()
+    self.index = CompositionIndex(dictionary.read_dictionary(self.path))
+    print(f"Loaded {len(self.index.compositions)} compositions from "
+          f"{self.path} in {time.perf_counter() - start:.3f} s", file=self.log)
+
+  async def reload_on_change(self):
+    while True:
+      await asyncio.sleep(self.reload_interval)
+      try:
+        if os.stat(self.path).st_mtime_ns != self.loaded_state:
+          self.load()
+      except (OSError, ValueError) as e:
+        # The dictionary is replaced atomically, but may be missing or
+        # malformed while someone edits it by hand; keep the old one.
+        print(f"Not reloading {self.path}: {e}", file=self.log)
+
+  def answer(self, query, parameters):
+    """Returns the response to query, a JSON-serializable object."""
+    def parameter(name):
+      value = parameters.get(name)
+      if not isinstance(value, str):
+        raise QueryError(f"{query} requires the parameter {name}")
+      return value
+
+    if query == "complete":
+      prefix = parameter("prefix")
+      try:
+        limit = int(parameters.get("limit", 20))
+      except (TypeError, ValueError):
+        raise QueryError("limit must be an integer")
+      if limit < 0:
+        raise QueryError("limit must not be negative")
+      return {"prefix": prefix,
+              "completions": [{"composition": composition, "sign": sign}
+                              for composition, sign
+                              in self.index.complete(prefix, limit)]}
+    if query == "exact":
+      composition = parameter("composition")
+      return {"composition": composition,
+              "sign": self.index.exact(composition)}
+    if query == "reverse":
+      sign = parameter("sign")
+      return {"sign": sign, "compositions": self.index.reverse(sign)}
+    raise QueryError(f"Unknown query {query}", status=404)
+
+  def respond(self, method, target, body):
+    """Returns the status and the JSON-serializable response for a request,
+    and the name under which its latency is recorded."""
+    url = urllib.parse.urlsplit(target)
+    query = url.path.strip("/")
+    if query == "metrics":
+      return 200, self.metrics.report(), query
+    if query == "batch":
+      if method != "POST":
+        raise QueryError("batch requires POST", status=405)
+      try:
+        queries = json.loads(body)
+      except ValueError as e:
+        raise QueryError(f"Malformed batch: {e}")
+      if not isinstance(queries, list) or not all(
+          isinstance(q, dict) for q in queries):
+        raise QueryError("A batch is a list of objects")
+      responses = []
+      for q in queries:
+        try:
+          responses.append(self.answer(q.get("query"), q))
+        except QueryError as e:
+          responses.append({"error": str(e)})
+      return 200, responses, query
+    if method != "GET":
+      raise QueryError(f"{query} requires GET", status=405)
+    parameters = dict(urllib.parse.parse_qsl(url.query,
+                                             keep_blank_values=True))
+    return 200, self.answer(query, parameters), query
+
+  async def handle_connection(self, reader, writer):
+    try:
+      while True:
+        request_line = await reader.readline()
+        if not request_line:
+          break
+        start = time.perf_counter()
+        headers = {}
+        while True:
+          line = await reader.readline()
+          if line in (b"\r\n", b"\n", b""):
+            break
+          name, _, value = line.decode("latin-1").partition(":")
+          headers[name.strip().lower()] = value.strip()
+        keep_alive = headers.get("connection", "").lower() != "close"
+        query = "error"
+        try:
+          method, target, _ = request_line.decode("latin-1").split(" ", 2)
+          length = int(headers.get("content-length", 0))
+          if length > MAX_BODY_BYTES:
+            keep_alive = False
+            raise QueryError("Request too large", status=413)
+          body = await reader.readexactly(length) if length else b""
+          status, response, query = self.respond(method, target, body)
+        except QueryError as e:
+          status, response = e.status, {"error": str(e)}
+        except ValueError:
+          status, response = 400, {"error": "Malformed request"}
+          keep_alive = False
+        data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            (f"HTTP/1.1 {status} {STATUS_REASONS[status]}\r\n"
+             f"Content-Type: application/json; charset=utf-8\r\n"
+             f"Content-Length: {len(data)}\r\n"
+             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+             f"\r\n").encode("latin-1") + data)
+        await writer.drain()
+        self.metrics.record(query, time.perf_counter() - start)
+        if not keep_alive:
+          break
+    except (ConnectionError, asyncio.IncompleteReadError):
+      pass
+    finally:
+      writer.close()
+
+  async def serve(self, host="127.0.0.1", port=8642, unix_socket=None):
+    if unix_socket:
+      server = await asyncio.start_unix_server(self.handle_connection,
+                                               unix_socket)
+      print(f"Serving on {unix_socket}", file=self.log)
+    else:
+      server = await asyncio.start_server(self.handle_connection, host, port)
+      print(f"Serving on http://{host}:{port}/", file=self.log)
+    reloader = asyncio.create_task(self.reload_on_change())
+    try:
+      async with server:
+        await server.serve_forever()
+    finally:
+      reloader.cancel()
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Serves completion, exact, reverse, and batch queries on the "
+                  "dictionary as JSON over HTTP, on localhost or on a Unix "
+                  "socket.")
+  parser.add_argument("dictionary", nargs="?",
+                      default=os.path.join(DICTIONARY_DIRECTORY,
+                                           "sign_list.txt"),
+                      help="the dictionary to serve, in any of its formats")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8642)
+  parser.add_argument("--unix-socket", metavar="PATH",
+                      help="listen on a Unix socket at PATH instead of TCP")
+  parser.add_argument("--reload-interval", type=float, default=1.0,
+                      help="seconds between checks for a new dictionary")
+  args = parser.parse_args()
+
+  server = CompletionServer(args.dictionary, args.reload_interval)
+  try:
+    asyncio.run(server.serve(args.host, args.port, args.unix_socket))
+  except KeyboardInterrupt:
+    pass
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,195 @@
+"""The coverage of a corpus of ATF transliterations by the compositions of a
+dictionary, to check a build against real text before it ships.
+
+Each file is read (see atf.py), in parallel, into the counts of its readings
+with the first few places where each occurs; those are cached with the size
+and modification time of the file, so that only the files added or changed
+since the last run are read again, whatever the dictionary.  Each reading is
+then
+  known      if it is a composition of the dictionary;
+  ambiguous  if it is not, but it is the value of compositions which are
+             disambiguated, as dux is of duxv1, duxv2, …, so that the reading
+             must be given with its v to be entered;
+  unknown    otherwise.
+The compositions which are neither known readings nor candidates of ambiguous
+ones are unused; the list numbers, which are not readings, are left out.
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+
+import atf
+import collation
+import dictionary
+import reconcile
+
+CACHE_PATH = os.path.join(".cache", "corpus_coverage", "files.pickle")
+
+# The number of places kept for each reading of each file.
+LOCATIONS = 5
+
+
+def profile_file(path):
+  """Returns the profile of the ATF file at path: the time taken to read it,
+  its numbers of transliteration lines, signs, and unreadable signs, and the
+  map from each reading to its count and the line numbers of its first
+  LOCATIONS occurrences."""
+  start = time.perf_counter()
+  lines = set()
+  signs = unreadable = 0
+  readings = {}
+  for token in atf.read_tokens(path):
+    lines.add(token.line_number)
+    signs += 1
+    if token.reading is None:
+      unreadable += 1
+      continue
+    occurrences = readings.setdefault(token.reading, [0, []])
+    occurrences[0] += 1
+    if len(occurrences[1]) < LOCATIONS:
+      occurrences[1].append(token.line_number)
+  return {"seconds": time.perf_counter() - start, "lines": len(lines),
+          "signs": signs, "unreadable": unreadable, "readings": readings}
+
+
+def profile_corpus(paths, jobs=1, cache_path=CACHE_PATH):
+  """Returns the map from each ATF file in paths (files or directories) to its
+  profile, computed in jobs processes (see atf.map_files), and the list of the
+  files which were read rather than taken from the cache at cache_path.  No
+  caching happens if cache_path is None."""
+  return atf.map_files(profile_file, atf.atf_files(paths), jobs, cache_path,
+                       atf.code_key(sys.modules[__name__]))
+
+
+def coverage(profiles, compositions, locations=LOCATIONS):
+  """Returns the coverage of the corpus whose profiles are given by the
+  compositions of compositions, a map from composition to sign: the totals,
+  and the known, ambiguous, unknown, and unused readings described above; the
+  ambiguous readings with their candidates, and the unknown ones with the first
+  few places where they occur, as path:line."""
+  candidates_by_value = reconcile.disambiguated_values(compositions)
+
+  counts = collections.Counter()
+  places = {}
+  for path, profile in profiles.items():
+    for reading, (count, line_numbers) in profile["readings"].items():
+      counts[reading] += count
+      if reading not in compositions:
+        reading_places = places.setdefault(reading, [])
+        reading_places += (f"{path}:{line_number}"
+                           for line_number in line_numbers
+                           [:locations - len(reading_places)])
+
+  known = {}
+  ambiguous = {}
+  unknown = {}
+  used = set()
+  for reading, count in counts.most_common():
+    if reading in compositions:
+      known[reading] = count
+      used.add(reading)
+    elif reading in candidates_by_value:
+      candidates = sorted(candidates_by_value[reading],
+                          key=collation.collation_key)
+      ambiguous[reading] = {"count": count, "candidates": candidates,
+                            "places": places[reading]}
+      used.update(candidates)
+    else:
+      unknown[reading] = {"count": count, "places": places[reading]}
+  signs = sum(profile["signs"] for profile in profiles.values())
+  unreadable = sum(profile["unreadable"] for profile in profiles.values())
+  readable = signs - unreadable
+  return {
+      "files": len(profiles),
+      "lines": sum(profile["lines"] for profile in profiles.values()),
+      "signs": signs,
+      "unreadable": unreadable,
+      "known": sum(known.values()) / readable if readable else 0,
+      "ambiguous": (sum(reading["count"] for reading in ambiguous.values()) /
+                    readable if readable else 0),
+      "unknown": (sum(reading["count"] for reading in unknown.values()) /
+                  readable if readable else 0),
+      "ambiguous_readings": ambiguous,
+      "unknown_readings": unknown,
+      "unused_compositions": sorted(
+          (composition for composition in compositions
+           if composition not in used and
+           not reconcile.is_list_number(composition)),
+          key=collation.collation_key),
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Reports how well the dictionary covers the ATF files at "
+                  "the given paths: the unknown readings and where they "
+                  "occur, the readings which need a v disambiguator, the "
+                  "compositions never used, and the time taken by each file.")
+  parser.add_argument("paths", nargs="+", metavar="path",
+                      help="ATF files, or directories searched for them")
+  parser.add_argument("--dictionary",
+                      default=os.path.join("Samples", "IME", "cpp",
+                                           "SampleIME", "Dictionary",
+                                           "sign_list.txt"),
+                      help="the dictionary, in any of its formats")
+  parser.add_argument("-n", "--limit", type=int, default=20,
+                      help="the number of readings and files listed in each "
+                           "part of the report")
+  parser.add_argument("--json",
+                      help="write the full report, with the timing of every "
+                           "file, to this file")
+  parser.add_argument("-j", "--jobs", type=int, default=0,
+                      help="read the files in JOBS processes (one per core by "
+                           "default)")
+  parser.add_argument("--no-cache", action="store_true",
+                      help="read every file even if its profile is cached")
+  args = parser.parse_args()
+
+  compositions = dictionary.read_dictionary(args.dictionary)
+  start = time.perf_counter()
+  profiles, read = profile_corpus(args.paths, args.jobs or None,
+                                  None if args.no_cache else CACHE_PATH)
+  elapsed = time.perf_counter() - start
+  report = coverage(profiles, compositions)
+  print(f"{report['files']} files ({len(read)} read, "
+        f"{report['files'] - len(read)} cached), {report['lines']} lines, "
+        f"{report['signs']} signs ({report['unreadable']} unreadable) in "
+        f"{elapsed:.2f} s")
+  print(f"known {report['known']:.2%}, ambiguous {report['ambiguous']:.2%}, "
+        f"unknown {report['unknown']:.2%} of the readable signs")
+
+  print(f"\n{len(report['unknown_readings'])} unknown readings:")
+  for reading, entry in list(report["unknown_readings"].items())[:args.limit]:
+    print(f"{entry['count']:>8}  {reading}\t{', '.join(entry['places'])}")
+  print(f"\n{len(report['ambiguous_readings'])} readings needing a "
+        "disambiguator:")
+  for reading, entry in list(
+      report["ambiguous_readings"].items())[:args.limit]:
+    print(f"{entry['count']:>8}  {reading}\t{', '.join(entry['candidates'])}")
+  unused = report["unused_compositions"]
+  print(f"\n{len(unused)} of {len(compositions)} compositions unused, e.g., "
+        f"{', '.join(unused[:args.limit])}")
+
+  timings = sorted(((profile["seconds"], path)
+                    for path, profile in profiles.items()), reverse=True)
+  print(f"\nslowest files (of {sum(t for t, _ in timings):.2f} s of reading, "
+        "cached ones as when they were read):")
+  for seconds, path in timings[:args.limit]:
+    print(f"{seconds * 1e3:>8.1f} ms  {path}  "
+          f"({profiles[path]['lines']} lines)")
+
+  if args.json:
+    report["timings"] = {path: {"seconds": profile["seconds"],
+                                "lines": profile["lines"],
+                                "signs": profile["signs"]}
+                         for path, profile in profiles.items()}
+    dictionary.write_atomically(
+        args.json,
+        json.dumps(report, ensure_ascii=False, indent=1).encode("utf-8"))
+
+
+if __name__ == "__main__":
+  main()
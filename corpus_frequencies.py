@@ -0,0 +1,201 @@
+"""The frequencies of the compositions in a corpus of ATF transliterations, by
+which the input method may rank its candidates.
+
+The readings of the signs of the transliterations (see atf.py) are counted
+file by file, in parallel; the counts of each file are cached with its size and
+modification time, so that only the files added or changed since the last run
+are read again.  A composition is counted as the reading that it spells; a
+reading which is not a composition but the value of compositions which are
+disambiguated, as dux is of duxv1, duxv2, …, is counted for the one whose sign
+is named by its qualifier, as in duₓ(KUD), or else for each of them.
+
+The build writes the frequencies to FREQUENCIES, a tab-separated file with a
+composition and its count on each line, by decreasing count, omitting the
+compositions which do not occur.  The rankings of the candidates are
+  collation  the order of the input method, which ignores frequencies;
+  tiebreak   the order of the input method, except that the homophones, such
+             as du, du2, du3, and dux, are ranked by frequency;
+  primary    by frequency, then in the order of the input method.
+"""
+import argparse
+import bisect
+import collections
+import os
+import sys
+import time
+
+import atf
+import collation
+import dictionary
+import homophones
+import prefixes
+import reconcile
+
+FREQUENCIES = "frequencies.tsv"
+
+CACHE_PATH = os.path.join(".cache", "corpus_frequencies", "counts.pickle")
+
+RANKINGS = ("collation", "tiebreak", "primary")
+
+
+def count_file(path):
+  """Returns the Counter of the (reading, qualifier) of the signs of the ATF
+  file at path."""
+  return collections.Counter((token.reading, token.qualifier)
+                             for token in atf.read_tokens(path)
+                             if token.reading is not None)
+
+
+def count_corpus(paths, jobs=1, cache_path=CACHE_PATH):
+  """Returns the Counter of the (reading, qualifier) of the signs of the ATF
+  files in paths (files or directories), counted in jobs processes (see
+  atf.map_files), and the number of files and of those which were read rather
+  than taken from the cache at cache_path.  No caching happens if cache_path is
+  None."""
+  files = atf.atf_files(paths)
+  counts_by_file, read = atf.map_files(
+      count_file, files, jobs, cache_path, atf.code_key(sys.modules[__name__]))
+  counts = collections.Counter()
+  for file_counts in counts_by_file.values():
+    counts.update(file_counts)
+  return counts, len(files), len(read)
+
+
+def composition_frequencies(counts, compositions):
+  """Returns the map from each composition of compositions which occurs to its
+  frequency, given counts, the Counter of the (reading, qualifier) of the
+  signs of a corpus."""
+  candidates_by_value = reconcile.disambiguated_values(compositions)
+  frequencies = collections.Counter()
+  for (reading, qualifier), count in counts.items():
+    if reading in compositions:
+      frequencies[reading] += count
+      continue
+    candidates = candidates_by_value.get(reading, ())
+    if qualifier is not None:
+      sign = compositions.get(atf.normalize_reading(qualifier))
+      candidates = ([candidate for candidate in candidates
+                     if compositions[candidate] == sign] or candidates)
+    for candidate in candidates:
+      frequencies[candidate] += count
+  return dict(frequencies)
+
+
+def write_frequencies(frequencies, directory):
+  """Writes frequencies to FREQUENCIES in directory, and returns its path."""
+  os.makedirs(directory, exist_ok=True)
+  path = os.path.join(directory, FREQUENCIES)
+  dictionary.write_atomically(path, "".join(
+      f"{composition}\t{count}\n" for composition, count in sorted(
+          frequencies.items(),
+          key=lambda item: (-item[1], collation.collation_key(item[0]))
+      )).encode("utf-8"))
+  return path
+
+
+def read_frequencies(path):
+  frequencies = {}
+  with open(path, encoding="utf-8") as f:
+    for line in f:
+      composition, count = line.rstrip("\n").split("\t")
+      frequencies[composition] = int(count)
+  return frequencies
+
+
+def ranking_key(ranking, frequencies):
+  """Returns the key by which to order the candidates for the given ranking,
+  one of RANKINGS, with frequencies, a map from composition to frequency."""
+  if ranking == "collation":
+    return collation.collation_key
+  if ranking == "primary":
+    return lambda composition: (-frequencies.get(composition, 0),
+                                collation.collation_key(composition))
+  if ranking == "tiebreak":
+    def key(composition):
+      split = homophones.split_composition(composition)
+      return (collation.collation_key(split[0] if split else composition),
+              -frequencies.get(composition, 0),
+              collation.collation_key(composition))
+    return key
+  raise ValueError(f"unknown ranking {ranking}")
+
+
+def evaluate(frequencies, compositions, ranking):
+  """Returns the statistics of the entry of the signs of the corpus whose
+  frequencies are given with the given ranking: the proportion of those which
+  are the first candidate when their value is typed without its index, as du
+  for du3, so that a space enters them, and the keystrokes needed to enter
+  them (see prefixes.keystroke_statistics)."""
+  key = ranking_key(ranking, frequencies)
+  ordered = sorted(compositions)
+  first_by_prefix = {}
+
+  def first_candidate(prefix):
+    if prefix not in first_by_prefix:
+      start = bisect.bisect_left(ordered, prefix)
+      end = bisect.bisect_left(ordered, prefix + "\U0010FFFF", start)
+      first_by_prefix[prefix] = min(ordered[start:end], key=key)
+    return first_by_prefix[prefix]
+
+  signs = sum(frequencies.values())
+  first = 0
+  for composition, count in frequencies.items():
+    split = homophones.split_composition(composition)
+    if first_candidate(split[0] if split else composition) == composition:
+      first += count
+  statistics = prefixes.keystroke_statistics(
+      prefixes.build_prefix_table(compositions, key), frequencies)
+  return {"signs": signs,
+          "first_candidate": first / signs if signs else 0,
+          "keystrokes": statistics["keystrokes"]}
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Counts the compositions of the dictionary in the ATF files "
+                  "at the given paths, prints how well each ranking of the "
+                  "candidates fits the corpus, and optionally writes the "
+                  "frequencies.")
+  parser.add_argument("paths", nargs="+", metavar="path",
+                      help="ATF files, or directories searched for them")
+  parser.add_argument("--dictionary",
+                      default=os.path.join("Samples", "IME", "cpp",
+                                           "SampleIME", "Dictionary",
+                                           "sign_list.txt"),
+                      help="the dictionary, in any of its formats")
+  parser.add_argument("-o", "--output-directory",
+                      help="directory in which to write " + FREQUENCIES)
+  parser.add_argument("-j", "--jobs", type=int, default=0,
+                      help="read the files in JOBS processes (one per core by "
+                           "default)")
+  parser.add_argument("--no-cache", action="store_true",
+                      help="read every file even if its counts are cached")
+  args = parser.parse_args()
+
+  compositions = dictionary.read_dictionary(args.dictionary)
+  start = time.perf_counter()
+  counts, files, read = count_corpus(args.paths, args.jobs or None,
+                                     None if args.no_cache else CACHE_PATH)
+  print(f"{files} files ({read} read, {files - read} cached), "
+        f"{sum(counts.values())} signs, "
+        f"{len(set(reading for reading, _ in counts))} readings in "
+        f"{time.perf_counter() - start:.2f} s")
+  frequencies = composition_frequencies(counts, compositions)
+  candidates_by_value = reconcile.disambiguated_values(compositions)
+  unknown = sum(count for (reading, _), count in counts.items()
+                if reading not in compositions and
+                reading not in candidates_by_value)
+  print(f"{len(frequencies)} compositions occur; {unknown} signs have "
+        "readings not in the dictionary")
+  print(f"{'ranking':12}{'first':>8}{'keys/sign':>11}{'saved':>8}")
+  for ranking in RANKINGS:
+    statistics = evaluate(frequencies, compositions, ranking)
+    best = statistics["keystrokes"]["best"]
+    print(f"{ranking:12}{statistics['first_candidate']:>8.1%}"
+          f"{best['mean']:>11.2f}{best['saved']:>8.1%}")
+  if args.output_directory:
+    write_frequencies(frequencies, args.output_directory)
+
+
+if __name__ == "__main__":
+  main()
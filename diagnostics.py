@@ -0,0 +1,45 @@
+import collections
+import sys
+
+Diagnostic = collections.namedtuple("Diagnostic", ("kind", "message"))
+
+
+class Diagnostics:
+  """Reports the errors found while building the sign lists.  By default, the
+  first error is raised as an exception, as the build scripts have always done.
+  If collect_all is true, every error is recorded and processing continues, so
+  that all the problems with an update of the inputs show up in a single run.
+  """
+
+  def __init__(self, collect_all=False):
+    self.collect_all = collect_all
+    self.diagnostics = []
+
+  def error(self, kind, message, exception=ValueError):
+    """Raises exception(message), or records it under kind if collecting all
+    errors.  kind groups the errors in the report, e.g., "Ambiguous
+    composition"; the message should identify the offending entry."""
+    if not self.collect_all:
+      raise exception(message)
+    self.diagnostics.append(Diagnostic(kind, str(message)))
+
+  def __bool__(self):
+    return bool(self.diagnostics)
+
+  def by_kind(self):
+    grouped = {}
+    for diagnostic in self.diagnostics:
+      grouped.setdefault(diagnostic.kind, []).append(diagnostic.message)
+    return grouped
+
+  def report(self, file=sys.stderr):
+    """Prints the recorded errors grouped by kind, and returns an exit code:
+    nonzero if there were any errors."""
+    grouped = self.by_kind()
+    for kind, messages in grouped.items():
+      print(f"{kind} ({len(messages)}):", file=file)
+      for message in messages:
+        print("    " + message.replace("\n", "\n      "), file=file)
+    if grouped:
+      print(f"{len(self.diagnostics)} errors", file=file)
+    return 1 if grouped else 0
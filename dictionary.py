@@ -0,0 +1,75 @@
+import json
+import os
+
+import snapshot
+
+# The text dictionaries are read by the input methods: sign_list.txt by both
+# the Windows and the macOS ones, sign_list.utf-8.txt being there for humans
+# and diffs.  The JSON dictionary is for tools.
+TEXT_DICTIONARIES = (("sign_list.txt", "utf-16"),
+                     ("sign_list.utf-8.txt", "utf-8"))
+JSON_DICTIONARY = "sign_list.json"
+
+# The dictionaries have historically been written on Windows by print, hence
+# with CRLF line endings.
+LINE_TERMINATOR = "\r\n"
+
+
+def format_dictionary(compositions):
+  """Returns the text of the dictionary, one "composition"="sign" line per
+  composition, sorted by composition.  compositions maps composition to sign.
+  """
+  return "".join(f'"{composition}"="{sign}"{LINE_TERMINATOR}'
+                 for composition, sign in sorted(compositions.items()))
+
+
+def write_atomically(path, data):
+  """Writes the given bytes to path, replacing any existing file in one step, so
+  that a reader never sees a partial dictionary."""
+  temporary_path = f"{path}.{os.getpid()}.tmp"
+  try:
+    with open(temporary_path, "wb") as f:
+      f.write(data)
+    os.replace(temporary_path, path)
+  except BaseException:
+    if os.path.exists(temporary_path):
+      os.remove(temporary_path)
+    raise
+
+
+def write_dictionary(compositions, directory):
+  """Writes the text and JSON dictionaries and the snapshot for compositions, a
+  map from composition to sign, into directory.  Returns the paths written."""
+  os.makedirs(directory, exist_ok=True)
+  text = format_dictionary(compositions)
+  paths = []
+  for filename, encoding in TEXT_DICTIONARIES:
+    paths.append(os.path.join(directory, filename))
+    write_atomically(paths[-1], text.encode(encoding))
+  paths.append(os.path.join(directory, JSON_DICTIONARY))
+  write_atomically(paths[-1],
+                   json.dumps(dict(sorted(compositions.items())),
+                              ensure_ascii=False, indent=0).encode("utf-8"))
+  paths.append(os.path.join(directory, snapshot.SNAPSHOT))
+  write_atomically(paths[-1], snapshot.format_snapshot(compositions))
+  return paths
+
+
+def read_dictionary(path):
+  """Reads a dictionary written by write_dictionary, in any of its formats."""
+  if path.endswith(".snapshot"):
+    return snapshot.load_snapshot(path)[0]
+  if path.endswith(".json"):
+    with open(path, encoding="utf-8") as f:
+      return json.load(f)
+  with open(path, "rb") as f:
+    data = f.read()
+  text = data.decode("utf-16" if data.startswith((b"\xff\xfe", b"\xfe\xff"))
+                     else "utf-8-sig")
+  compositions = {}
+  for line in text.splitlines():
+    if not line:
+      continue
+    composition, sign = line.split("=", 1)
+    compositions[composition.strip('"')] = sign.strip('"')
+  return compositions
@@ -0,0 +1,125 @@
+"""The homophones of the dictionaries: for each base value, the compositions of
+all its indexed variants, so that a homophone picker can list every du, du₂,
+du₃, …, duₓ without scanning the dictionary.
+
+The build writes them to HOMOPHONES, a JSON object mapping each base value to
+its variants in order of index (none, that is 1, then 2, 3, …, then x), then of
+disambiguator, each as an object with "composition", "index", "sign", and
+"sources", the dictionaries which have that composition for that sign.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sys
+
+import dictionary
+import reconcile
+
+HOMOPHONES = "homophones.json"
+
+# The disambiguators are those of reconcile.py, including the + or - which
+# ogsl.py writes for the ⁺ or ⁻ of values such as gir₅⁻ and dun₃⁺.
+COMPOSITION = re.compile(
+    r"^(?P<base>.*?)(?P<index>\d+|x)?(?P<disambiguator>" +
+    reconcile.DISAMBIGUATOR_PATTERN + r"*)$")
+
+
+def split_composition(composition):
+  """Returns the base value, index, and disambiguator of composition, e.g.,
+  ("du", "3", "v1") for du3v1 or ("gir", "5", "-") for gir5-, or None if
+  composition is not a value, as for list numbers, numbers, and punctuation."""
+  if reconcile.is_list_number(composition):
+    return None
+  match = COMPOSITION.match(composition)
+  base = match["base"]
+  if not base.isalpha() or not base.islower():
+    return None
+  return base, match["index"] or "", match["disambiguator"]
+
+
+def collation_key(composition):
+  base, index, disambiguator = split_composition(composition)
+  return (1 if not index else math.inf if index == "x" else int(index),
+          [(int(part[1:]), "") if part.startswith("v") else (0, part)
+           for part in re.findall(reconcile.DISAMBIGUATOR_PATTERN,
+                                  disambiguator)],
+          composition)
+
+
+def build_homophones(dictionaries):
+  """Returns the map from base value to the list of its variants described
+  above, for dictionaries, a map from the name of a dictionary to its
+  compositions, a map from composition to sign."""
+  variants_by_composition_and_sign = {}
+  for source, compositions in dictionaries.items():
+    for composition, sign in compositions.items():
+      if split_composition(composition) is None:
+        continue
+      variant = variants_by_composition_and_sign.setdefault(
+          (composition, sign),
+          {"composition": composition,
+           "index": split_composition(composition)[1],
+           "sign": sign,
+           "sources": []})
+      variant["sources"].append(source)
+  homophones = {}
+  for (composition, _), variant in sorted(
+      variants_by_composition_and_sign.items(),
+      key=lambda item: (collation_key(item[0][0]), item[0][1])):
+    homophones.setdefault(split_composition(composition)[0],
+                          []).append(variant)
+  return dict(sorted(homophones.items()))
+
+
+def write_homophones(homophones, directory):
+  """Writes homophones to HOMOPHONES in directory, and returns its path."""
+  os.makedirs(directory, exist_ok=True)
+  path = os.path.join(directory, HOMOPHONES)
+  dictionary.write_atomically(
+      path,
+      json.dumps(homophones, ensure_ascii=False, indent=0).encode("utf-8"))
+  return path
+
+
+class Homophones:
+  """The homophones written by write_homophones."""
+
+  def __init__(self, homophones):
+    self.homophones = homophones
+
+  @staticmethod
+  def load(path):
+    with open(path, encoding="utf-8") as f:
+      return Homophones(json.load(f))
+
+  def variants(self, value):
+    """Returns the variants of the base of value, which may be given with an
+    index or disambiguator, so that du, du3, and du3v1 all give those of
+    du; an empty list if there are none."""
+    split = split_composition(value)
+    return self.homophones.get(split[0], []) if split else []
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Prints the homophones of the given values.")
+  parser.add_argument("values", nargs="+", metavar="value")
+  parser.add_argument("--homophones",
+                      default=os.path.join("reconciled", HOMOPHONES),
+                      help="the homophones written by build.py")
+  args = parser.parse_args()
+
+  homophones = Homophones.load(args.homophones)
+  for value in args.values:
+    variants = homophones.variants(value)
+    if not variants:
+      print(f"{value}: no homophones", file=sys.stderr)
+    for variant in variants:
+      print(f"{variant['composition']}\t{variant['sign']}\t"
+            f"{', '.join(variant['sources'])}")
+
+
+if __name__ == "__main__":
+  main()
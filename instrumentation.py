@@ -0,0 +1,82 @@
+import contextlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+
+class Profile:
+  """Records the wall time, CPU time, peak traced memory, and number of items
+  of each stage of a build.  If not enabled, stage does nothing, so that the
+  build scripts can always be written with stages.  Tracing the allocations
+  slows the build down severalfold, and the times with it; if trace_memory is
+  false, the peak memory is not recorded."""
+
+  def __init__(self, name, enabled=True, trace_memory=True):
+    self.name = name
+    self.enabled = enabled
+    self.trace_memory = trace_memory
+    self.stages = []
+
+  @contextlib.contextmanager
+  def stage(self, name):
+    """Measures the enclosed stage.  Yields the record of the stage, whose
+    "items" the caller should set to the number of items it produced, e.g.,
+    lines, forms, or compositions.  Stages must not be nested, as they share
+    the peak of the traced memory."""
+    record = {"stage": name, "items": None}
+    if not self.enabled:
+      yield record
+      return
+    started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+      tracemalloc.start()
+    if self.trace_memory:
+      tracemalloc.reset_peak()
+      baseline = tracemalloc.get_traced_memory()[0]
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+      yield record
+    finally:
+      record["wall_seconds"] = time.perf_counter() - wall_start
+      record["cpu_seconds"] = time.process_time() - cpu_start
+      record["peak_bytes"] = (tracemalloc.get_traced_memory()[1] - baseline
+                              if self.trace_memory else None)
+      if started_tracing:
+        tracemalloc.stop()
+      self.stages.append(record)
+
+  def report(self):
+    return {
+        "name": self.name,
+        "python": platform.python_version(),
+        "memory_traced": self.trace_memory,
+        "platform": platform.platform(),
+        "stages": self.stages,
+        "total": {
+            "wall_seconds": sum(s["wall_seconds"] for s in self.stages),
+            "cpu_seconds": sum(s["cpu_seconds"] for s in self.stages),
+            "peak_bytes": (max((s["peak_bytes"] for s in self.stages),
+                               default=0)
+                           if self.trace_memory else None),
+        },
+    }
+
+  def write_json(self, path):
+    with open(path, "w", encoding="utf-8") as f:
+      json.dump(self.report(), f, ensure_ascii=False, indent=1)
+
+  def print_summary(self, file=sys.stderr):
+    report = self.report()
+    print(f"{'stage':24}{'wall (s)':>10}{'CPU (s)':>10}{'peak (MiB)':>12}"
+          f"{'items':>10}{'items/s':>12}", file=file)
+    for s in self.stages + [dict(report["total"], stage="total", items=None)]:
+      peak = (f"{s['peak_bytes'] / 2**20:.1f}"
+              if s["peak_bytes"] is not None else "")
+      items = s["items"] if s["items"] is not None else ""
+      rate = (f"{s['items'] / s['wall_seconds']:.0f}"
+              if s["items"] and s["wall_seconds"] else "")
+      print(f"{s['stage']:24}{s['wall_seconds']:>10.3f}{s['cpu_seconds']:>10.3f}"
+            f"{peak:>12}{items:>10}{rate:>12}", file=file)
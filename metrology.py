@@ -0,0 +1,158 @@
+import functools
+
+import numerals
+
+
+class Unit:
+  """A unit of a metrological system, e.g., the bur₃.  size is the number of
+  the smallest units of the system that make one of this unit; digits maps a
+  count of this unit to the variants of its numeral."""
+
+  def __init__(self, name, size, digits):
+    self.name = name
+    self.size = size
+    self._digits = digits
+
+  @functools.cached_property
+  def digits(self):
+    # digits may be a function building the map, called on first use, for the
+    # large tables.
+    return self._digits() if callable(self._digits) else self._digits
+
+  @functools.cached_property
+  def counts_by_numeral(self):
+    counts_by_numeral = {}
+    for count, variants in sorted(self.digits.items()):
+      for variant in variants:
+        counts_by_numeral.setdefault(variant, count)
+    return counts_by_numeral
+
+  @functools.cached_property
+  def max_numeral_length(self):
+    return max(len(numeral) for numeral in self.counts_by_numeral)
+
+  def numeral(self, count, variant):
+    variants = self.digits[count]
+    return variants[min(variant, len(variants) - 1)]
+
+  def parse_prefix(self, text, start):
+    """Returns (count, end) for the longest numeral of this unit found at
+    text[start:], or (0, start) if there is none."""
+    for length in range(min(self.max_numeral_length, len(text) - start), 0, -1):
+      count = self.counts_by_numeral.get(text[start:start + length])
+      if count:
+        return count, start + length
+    return 0, start
+
+
+class System:
+  """A metrological system whose quantities are written as a sequence of
+  numerals of decreasing units.  Quantities are given in base_unit, of which
+  there are scale smallest units."""
+
+  def __init__(self, name, base_unit, scale, units):
+    self.name = name
+    self.base_unit = base_unit
+    self.scale = scale
+    # Largest first, as written.
+    self.units = sorted(units, key=lambda unit: unit.size, reverse=True)
+
+  def to_smallest_units(self, quantity):
+    numerator, denominator = quantity.as_integer_ratio()
+    smallest_units, remainder = divmod(numerator * self.scale, denominator)
+    if remainder or smallest_units < 0:
+      raise ValueError(f"{quantity} {self.base_unit} cannot be written in the "
+                       f"{self.name} system")
+    return smallest_units
+
+  def from_smallest_units(self, smallest_units):
+    quantity, remainder = divmod(smallest_units, self.scale)
+    return quantity if not remainder else smallest_units / self.scale
+
+  def render(self, quantity, variant=numerals.THREE_ROW):
+    smallest_units = self.to_smallest_units(quantity)
+    numeral = ""
+    for unit in self.units:
+      count, smallest_units = divmod(smallest_units, unit.size)
+      if count:
+        if count not in unit.digits:
+          raise ValueError(f"{quantity} {self.base_unit} is too large for the "
+                           f"{self.name} system")
+        numeral += unit.numeral(count, variant)
+    return numeral
+
+  def parse(self, numeral):
+    # The empty numeral is that of 0, as render writes it.
+    smallest_units = 0
+    position = 0
+    for unit in self.units:
+      count, position = unit.parse_prefix(numeral, position)
+      smallest_units += count * unit.size
+    if position != len(numeral):
+      raise ValueError(f"{numeral} is not a numeral of the {self.name} system "
+                       f"(unparsed {numeral[position:]})")
+    return self.from_smallest_units(smallest_units)
+
+
+def simple_digits(sequence):
+  return {count: variants for count, variants in enumerate(sequence) if variants}
+
+
+def sexagesimal_digits(units_sequence, tens_sequence):
+  return {n: numerals.sexagesimal_variants(n, [(units_sequence, tens_sequence)])
+          for n in range(1, 60)}
+
+
+# The area system, in iku; the smallest unit is ⅛ iku.  1 eše₃ = 6 iku,
+# 1 bur₃ = 3 eše₃, and the bur₃ is counted sexagesimally with the šar₂ and
+# šargal as its higher places, see numerals.SEXAGESIMAL_UNITS.
+AREA = System("area", "iku", 8, [
+    Unit("1/8iku", 1, {1: numerals.IKU_FRACTIONS["1/8"]}),
+    Unit("1/4iku", 2, {1: numerals.IKU_FRACTIONS["1/4"]}),
+    Unit("1/2iku", 4, {1: numerals.IKU_FRACTIONS["1/2"]}),
+    Unit("iku", 8, simple_digits(numerals.IKU_NUMERALS)),
+    Unit("eše3", 6 * 8, simple_digits(numerals.ÈŠE_NUMERALS)),
+    Unit("bur3", 18 * 8, sexagesimal_digits(numerals.BÙR_NUMERALS,
+                                             numerals.BURʾU_NUMERALS)),
+    Unit("šar2", 60 * 18 * 8, sexagesimal_digits(numerals.ŠÁR_NUMERALS,
+                                                  numerals.ŠARʾU_NUMERALS)),
+    Unit("šargal", 60 * 60 * 18 * 8,
+         sexagesimal_digits(numerals.ŠARGAL_NUMERALS,
+                             numerals.ŠARʾUGAL_NUMERALS)),
+])
+
+# The Neo-Sumerian / Old Babylonian capacity system, in ban₂:
+# 1 barig = 6 ban₂, 1 gur = 5 barig.  The gur are counted with the counting
+# numbers, followed by GUR.
+GUR = "𒄥"
+
+
+def gur_digits():
+  return {n: [numeral + GUR for numeral in numerals.sexagesimal_variants(
+              n, numerals.SEXAGESIMAL_PLACES[:2])]
+          for n in range(1, 60 * 60)}
+
+
+CAPACITY = System("capacity", "ban2", 1, [
+    Unit("ban2", 1, simple_digits(numerals.BÁN_NUMERALS)),
+    Unit("barig", 6, simple_digits(numerals.BARIG_NUMERALS)),
+    # Built on first use, since it takes tens of milliseconds.
+    Unit("gur", 30, gur_digits),
+])
+
+SYSTEMS = {system.name: system for system in (AREA, CAPACITY)}
+
+
+def render(quantities, system, variant=numerals.THREE_ROW):
+  """Returns the numerals for quantities, an iterable of quantities in the base
+  unit of system (iku for AREA, ban₂ for CAPACITY), given as integers, floats,
+  or anything with an as_integer_ratio."""
+  return [system.render(quantity, variant) for quantity in quantities]
+
+
+def parse(written_numerals, system):
+  """Returns the quantities, in the base unit of system, written by
+  written_numerals, the empty numeral being 0.  The quantities are integers
+  where possible, floats (which are exact, since the fractions are dyadic)
+  otherwise."""
+  return [system.parse(numeral) for numeral in written_numerals]
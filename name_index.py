@@ -0,0 +1,250 @@
+"""Search of the encoded signs by name, for a sign inspector that shows the
+matches as the user types.
+
+The names are the Unicode names of the codepoints of the cuneiform blocks, the
+OGSL names of the encoded forms, and their list numbers.  They are folded to
+the conventions of the Unicode names, so that GAN₂, GAN2, and gan2 are the
+same, as are ŠU and SHU.  NameIndex finds substrings through an index of the
+trigrams of the folded names, and tokens through a sorted list of their words,
+and ranks whole names before prefixes, prefixes before words, and words before
+other substrings.  The matches are by encoding, with all the names of that
+encoding.
+"""
+import argparse
+import bisect
+import collections
+import contextlib
+import hashlib
+import os
+import pickle
+import re
+import sys
+import time
+import unicodedata
+
+import ogsl
+from diagnostics import Diagnostics
+
+CACHE_DIRECTORY = os.path.join(".cache", "name_index")
+
+# Bump whenever the layout of the cached index changes.
+CACHE_VERSION = 1
+
+FOLDING = str.maketrans({"Š": "SH", "Ḫ": "H", "|": "",
+                         **{chr(ord("₀") + d): str(d) for d in range(10)}})
+
+# The characters separating the words of a name: LAK-079 has the words LAK and
+# 079, |KA×GAR| the words KA and GAR.
+WORD_SEPARATORS = re.compile(r"[\s\-.+:×&%@()~]+")
+
+# The ranks of the matches, best first.
+WHOLE_NAME, PREFIX, WORDS, SUBSTRING = range(4)
+
+NameMatch = collections.namedtuple(
+    "NameMatch", ("encoding", "rank", "name", "kind", "names"))
+
+
+def fold(name):
+  return name.upper().translate(FOLDING)
+
+
+def words(folded_name):
+  return [word for word in WORD_SEPARATORS.split(folded_name) if word]
+
+
+def trigrams(folded_name):
+  return set(folded_name[i:i+3] for i in range(len(folded_name) - 2))
+
+
+def unicode_names():
+  """Yields (encoding, "unicode", name) for the named codepoints of the
+  cuneiform blocks, without the CUNEIFORM SIGN prefix."""
+  for u in ogsl.COVERED_CODEPOINTS:
+    name = unicodedata.name(chr(u), None)
+    if name:
+      yield chr(u), "unicode", re.sub("^CUNEIFORM (SIGN )?", "", name)
+
+
+def ogsl_names(model):
+  """Yields (encoding, "ogsl" or "list", name) for the OGSL names and list
+  numbers of the encoded forms of model."""
+  for name, forms in model.forms_by_name.items():
+    encoding = forms[0].codepoints
+    if not encoding or not all(ord(c) >= 0x12000 for c in encoding):
+      continue
+    yield encoding, "ogsl", name
+    for list_number in sorted(set(l for form in forms for l in form.lists)):
+      yield encoding, "list", list_number
+
+
+class NameIndex:
+  """The index of the names given as (encoding, kind, name), where kind is
+  "unicode", "ogsl", or "list"."""
+
+  def __init__(self, names):
+    self.names = []
+    self.folded_names = []
+    self.names_by_encoding = {}
+    postings_by_trigram = {}
+    postings_by_word = {}
+    for encoding, kind, name in names:
+      kinds = self.names_by_encoding.setdefault(encoding, {})
+      if name in kinds.get(kind, ()):
+        continue
+      kinds.setdefault(kind, []).append(name)
+      i = len(self.names)
+      self.names.append((encoding, kind, name))
+      folded_name = fold(name)
+      self.folded_names.append(folded_name)
+      for trigram in trigrams(folded_name):
+        postings_by_trigram.setdefault(trigram, []).append(i)
+      for word in set(words(folded_name)):
+        postings_by_word.setdefault(word, []).append(i)
+    self.postings_by_trigram = {trigram: tuple(postings) for trigram, postings
+                                in postings_by_trigram.items()}
+    self.words = sorted(postings_by_word)
+    self.postings_by_word = [tuple(postings_by_word[word])
+                             for word in self.words]
+
+  def names_with_word_prefix(self, prefix):
+    """Returns the indices of the names having a word starting with prefix."""
+    result = set()
+    for i in range(bisect.bisect_left(self.words, prefix), len(self.words)):
+      if not self.words[i].startswith(prefix):
+        break
+      result.update(self.postings_by_word[i])
+    return result
+
+  def rank(self, folded_query, folded_name, query_words):
+    if folded_name == folded_query:
+      return WHOLE_NAME
+    if folded_name.startswith(folded_query):
+      return PREFIX
+    name_words = words(folded_name)
+    if all(any(word.startswith(query_word) for word in name_words)
+           for query_word in query_words):
+      return WORDS
+    if folded_query in folded_name:
+      return SUBSTRING
+    return None
+
+  def search(self, query, limit=20):
+    """Returns at most limit NameMatches for query, one per encoding, best
+    first, then by shortest name.  A name matches if it contains query, or if
+    each word of query starts a word of the name, in any order."""
+    folded_query = fold(query.strip())
+    query_words = words(folded_query)
+    if not query_words:
+      return []
+    # The names containing every word of the query at the start of one of
+    # their words, and those containing the query.
+    candidates = None
+    for word in query_words:
+      names = self.names_with_word_prefix(word)
+      candidates = names if candidates is None else candidates & names
+    if len(folded_query) >= 3:
+      # Any name containing the query contains its rarest trigram.
+      candidates |= set(min(
+          (self.postings_by_trigram.get(trigram, ())
+           for trigram in trigrams(folded_query)), key=len))
+    best_by_encoding = {}
+    for i in candidates:
+      rank = self.rank(folded_query, self.folded_names[i], query_words)
+      if rank is None:
+        continue
+      encoding, kind, name = self.names[i]
+      key = (rank, len(name), name)
+      if encoding not in best_by_encoding or key < best_by_encoding[encoding][0]:
+        best_by_encoding[encoding] = (key, kind, name)
+    ranked = sorted(best_by_encoding.items(),
+                    key=lambda item: (item[1][0], item[0]))[:limit]
+    return [NameMatch(encoding, key[0], name, kind,
+                      self.names_by_encoding[encoding])
+            for encoding, (key, kind, name) in ranked]
+
+
+def index_key(path):
+  key = hashlib.sha256(
+      f"{CACHE_VERSION} {unicodedata.unidata_version}".encode("ascii"))
+  for input_path in (path, __file__, ogsl.__file__):
+    with open(input_path, "rb") as f:
+      key.update(hashlib.sha256(f.read()).digest())
+  return key.hexdigest()
+
+
+def load_index(path=None, cache_directory=CACHE_DIRECTORY, diagnostics=None):
+  """Returns the NameIndex of the Unicode names and, if path is not None, of
+  the names and list numbers of the OGSL file at path, with its fixups applied,
+  from a cached copy in cache_directory if there is an up-to-date one.  No
+  caching happens if cache_directory is None."""
+  if diagnostics is None:
+    diagnostics = Diagnostics()
+  if path is None:
+    return NameIndex(unicode_names())
+  if cache_directory is not None:
+    key = index_key(path)
+    cache_path = os.path.join(cache_directory, f"index.{key[:16]}.pickle")
+    try:
+      with open(cache_path, "rb") as f:
+        cached = pickle.load(f)
+      if cached["key"] == key:
+        return cached["index"]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+      pass
+  model = ogsl.parse_ogsl(path, diagnostics)
+  ogsl.apply_fixups(model, diagnostics)
+  index = NameIndex(list(unicode_names()) + list(ogsl_names(model)))
+  if cache_directory is not None:
+    os.makedirs(cache_directory, exist_ok=True)
+    temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+      pickle.dump({"key": key, "index": index}, f,
+                  protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, cache_path)
+  return index
+
+
+def print_matches(matches, file=sys.stdout):
+  for match in matches:
+    names = "; ".join(", ".join(names) for names in match.names.values())
+    print(f"{match.encoding}\t{match.name}\t({names})", file=file)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Finds the encoded signs whose Unicode names, OGSL names, or "
+                  "list numbers match the given queries, e.g., 'TIMES GAN2 "
+                  "TENU' or 'LAK-'.  Without queries, reads one query per "
+                  "line, as a sign inspector would as the user types.")
+  parser.add_argument("queries", nargs="*", metavar="query")
+  parser.add_argument("--ogsl",
+                      help="the ogsl.asl file of a checkout of the OGSL, to "
+                           "also search its names and list numbers")
+  parser.add_argument("-n", "--limit", type=int, default=20,
+                      help="maximum number of matches per query")
+  parser.add_argument("--no-cache", action="store_true",
+                      help="index the OGSL even if a cached index is up to "
+                           "date")
+  args = parser.parse_args()
+
+  # As in sign_search.py, drifted fixups should not prevent a search.
+  diagnostics = Diagnostics(collect_all=True)
+  start = time.perf_counter()
+  with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+    index = load_index(args.ogsl, None if args.no_cache else CACHE_DIRECTORY,
+                       diagnostics)
+  print(f"Indexed {len(index.names)} names of {len(index.names_by_encoding)} "
+        f"encodings in {time.perf_counter() - start:.3f} s" +
+        (f" ({len(diagnostics.diagnostics)} errors)" if diagnostics else ""),
+        file=sys.stderr)
+  for query in args.queries or sys.stdin:
+    start = time.perf_counter()
+    matches = index.search(query, args.limit)
+    print(f"{query.strip()}: {len(matches)} matches in "
+          f"{(time.perf_counter() - start) * 1e3:.2f} ms", file=sys.stderr)
+    print_matches(matches)
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+  main()
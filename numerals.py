@@ -0,0 +1,508 @@
+﻿
+"""The numerals of the Sumero-Akkadian number systems and metrology.
+
+Importing this module only defines the tables; the compositions are built on
+first access to compositions or compositions_by_sign, and the tables are
+checked against the Unicode numeric values by validate().
+"""
+import functools
+import re
+import unicodedata
+
+BASIC_FRACTIONS = {
+  "1/2": ['𒈦'],
+  "1/3": ['𒑚'],
+  "2/3": ['𒑛'],
+  "5/6": ['𒑜'],
+}
+
+# For these we provide both the 3-row and the 2-row variants, the first one
+# being the 3-row one, described as the normal Babylonian form in Friberg
+# (2007), 0.4 f.  See also Friberg p. 50-52.
+# Note that this is reversed from
+# http://oracc.museum.upenn.edu/doc/help/editinginatf/metrology/metrologicaltables/index.html,
+# but same as
+# http://oracc.museum.upenn.edu/doc/help/editinginatf/maths/index.html.
+DIŠ_NUMERALS = [
+  [],
+  ['𒁹'],
+  ['𒈫'],
+  ['𒐈'],
+  ['𒐼', '𒐉'],
+  ['𒐊'],
+  ['𒐋'],
+  ['𒑂', '𒐌'],
+  ['𒑄', '𒐍'],
+  ['𒑆', '𒐎'],
+]
+
+# Only the first five are used as part of the counting number systems, the rest
+# appear as BÙR.  We still put them in this list so that the signs may be
+# referred to by name as a ligature of multiple U signs.
+# Again we follow Friberg to choose the normal form, backwards from Oracc metrology,
+# same as Oracc maths (see Friberg p. 53).
+U_NUMERALS = [
+  [],
+  ['𒌋'],
+  ['𒎙'],
+  ['𒌍'],
+  ['𒑩', '𒐏'],
+  ['𒑪', '𒐐'],
+  ['𒑫', '𒐑'],
+  ['𒑬', '𒐒'],
+  ['𒑭', '𒐓'],
+  ['𒑮', '𒐔'],
+]
+
+GÉŠ_NUMERALS = [
+  [],
+  ['𒐕'],
+  ['𒐖'],
+  ['𒐗'],
+  ['𒐘'],
+  ['𒐙'],
+  ['𒐚'],
+  ['𒐛'],
+  ['𒐜'],
+  ['𒐝'],
+]
+
+GEŠʾU_NUMERALS = [
+  [],
+  ['𒐞'],
+  ['𒐟'],
+  ['𒐠'],
+  ['𒐡'],
+  ['𒐢'],
+]
+
+ŠÁR_NUMERALS = [
+  [],
+  ['𒊹'],
+  ['𒐣'],
+  ['𒐤', '𒐥'],
+  ['𒐦'],
+  ['𒐧'],
+  ['𒐨'],
+  ['𒐩'],
+  ['𒐪'],
+  ['𒐫'],
+]
+
+ŠARʾU_NUMERALS = [
+  [],
+  ['𒐬'],
+  ['𒐭'],
+  ['𒐮', '𒐯'],
+  ['𒐰'],
+  ['𒐱'],
+]
+
+ŠARGAL_NUMERALS = [
+  [sign + '𒃲' for sign in signs] for signs in ŠÁR_NUMERALS
+]
+ŠARGAL_NUMERALS[1] += '𒐲'
+ŠARGAL_NUMERALS[2] += '𒐳'
+
+ŠARʾUGAL_NUMERALS = [
+  [sign + '𒃲' for sign in signs] for signs in ŠARʾU_NUMERALS
+]
+
+ŠARKID_NUMERALS = [
+  [sign + '𒆤' for sign in signs] for signs in ŠÁR_NUMERALS
+]
+
+AŠ_NUMERALS = [
+  [],
+  ['𒀸'],
+  ['𒐀'],
+  ['𒐁', '𒐻'],
+  ['𒐂'],
+  ['𒐃'],
+  ['𒐄'],
+  ['𒐅'],
+  ['𒐆'],
+  ['𒐇'],
+]
+
+# Measures of area.
+
+IKU_FRACTIONS = {
+  "1/2": ['𒀹'],
+  "1/4": ['𒑠'],
+  "1/8": ['𒑟'],
+}
+
+IKU_NUMERALS = AŠ_NUMERALS[:6]
+
+ÈŠE_NUMERALS = [
+  [],
+  ['𒑘'],
+  ['𒑙'],
+]
+
+BÙR_NUMERALS = U_NUMERALS
+
+BURʾU_NUMERALS = [
+  [],
+  ['𒐴'],
+  ['𒐵'],
+  ['𒐶', '𒐷'],
+  ['𒐸'],
+  ['𒐹'],
+]
+
+# Measures of capacity.
+
+BARIG_NUMERALS = [
+  [],
+  ['𒁹'],
+  ['𒑖'],
+  ['𒑗'],
+  ['𒐉'],
+]
+
+BÁN_NUMERALS = [
+  [],
+  ['𒑏'],
+  ['𒑐'],
+  ['𒑑'],
+  ['𒑒', '𒑓'],
+  ['𒑔', '𒑕'],
+]
+
+def numeric_value(c):
+  if len(c) > 1:
+    return None
+  try:
+    return unicodedata.numeric(c)
+  except ValueError:
+    return None
+
+
+def validate():
+  """Checks that the numerals in the tables have the Unicode numeric values
+  expected from their position, and that the compositions are consistent, both
+  with themselves and with numeral_variants.  Raises ValueError otherwise."""
+  for name, sequence in globals().items():
+    if not name.endswith(('_NUMERALS', '_FRACTIONS')):
+      continue
+    if isinstance(sequence, list):
+      for i in range(len(sequence)):
+        for variant in sequence[i]:
+          value = numeric_value(variant)
+          expected_value = 60 ** 3 * i if name == 'ŠARGAL_NUMERALS' else i
+          if value is not None and value != expected_value:
+            raise ValueError(
+                '%s has numeric value %s but is at position %s in %s' % (
+                    variant, value, i, name))
+    elif isinstance(sequence, dict):
+      for sequence_value, variants in sequence.items():
+        for variant in variants:
+          value = numeric_value(variant)
+          numerator, denominator = sequence_value.split('/')
+          if (value is not None and
+              value != int(numerator) / int(denominator)):
+            raise ValueError(
+                '%s has numeric value %s but is at %s in %s' % (
+                    variant, value, sequence_value, name))
+  for composition, sign in build_compositions().items():
+    if numeral_sign(composition) != sign:
+      raise ValueError('%s is %s but is composed as %s' % (
+          composition, sign, numeral_sign(composition)))
+
+def add_simple_compositions(compositions, unit_name, unit_sequence):
+  for n, variants in (
+      unit_sequence.items() if isinstance(unit_sequence, dict) else
+      enumerate(unit_sequence)):
+    variant = 0
+    for sign in variants:
+      composition = str(n) + unit_name
+      if variant:
+        composition += 'v%s' % variant
+      if composition in compositions and compositions[composition] != sign:
+        raise ValueError('Inconsistent signs for %s: %s, %s' % (
+            composition, sign, compositions[composition]))
+      compositions[composition] = sign
+      variant += 1
+
+def add_sexagesimal_compositions(compositions, unit, units_sequence,
+                                 tens_sequence):
+  for n in range(1, 60):
+    tens = n // 10
+    units = n % 10
+    variant = 0
+    for tens_sign in tens_sequence[tens] or ['']:
+      for units_sign in units_sequence[units] or ['']:
+        if isinstance(unit, str):
+          composition = str(n) + unit
+        else:
+          if not unit in (60 ** n for n in range(4)):
+            raise ValueError('Unexpected unit value %r' % unit)
+          composition = str(n * unit)
+        if variant:
+          composition += 'v%s' % variant
+        sign = tens_sign + units_sign
+        if composition in compositions and compositions[composition] != sign:
+          raise ValueError('Inconsistent signs for %s: %s, %s' % (
+              composition, sign, compositions[composition]))
+        compositions[composition] = sign
+        variant += 1
+
+@functools.cache
+def build_compositions():
+  """Returns the map from composition to sign for the numerals, built once."""
+  compositions = {}
+  add_simple_compositions(compositions, '', BASIC_FRACTIONS)
+
+  # These form beginning of the Sumerian counting number system, as well as the
+  # digits of the sexagesimal positional number system.
+  add_sexagesimal_compositions(compositions, 1, DIŠ_NUMERALS, U_NUMERALS)
+  # Neo-Sumerian / Old Babylonian counting number system.
+  add_sexagesimal_compositions(compositions, 60, GÉŠ_NUMERALS, GEŠʾU_NUMERALS)
+  add_sexagesimal_compositions(compositions, 60 ** 2, ŠÁR_NUMERALS, ŠARʾU_NUMERALS)
+  add_sexagesimal_compositions(compositions, 60 ** 3, ŠARGAL_NUMERALS, ŠARʾUGAL_NUMERALS)
+
+  # Neo-Sumerian / Old Babylonian capacity system.
+  add_simple_compositions(compositions, 'ban2', BÁN_NUMERALS)
+  add_simple_compositions(compositions, 'barig', BARIG_NUMERALS)
+
+  # Area system.
+  add_simple_compositions(compositions, 'iku', IKU_FRACTIONS)
+  add_simple_compositions(compositions, 'iku', IKU_NUMERALS)
+  add_simple_compositions(compositions, 'eše3', ÈŠE_NUMERALS)
+  add_sexagesimal_compositions(compositions, 'bur3', BÙR_NUMERALS, BURʾU_NUMERALS)
+  add_sexagesimal_compositions(compositions, 'šar2', ŠÁR_NUMERALS, ŠARʾU_NUMERALS)
+  add_sexagesimal_compositions(compositions, 'šargal', ŠARGAL_NUMERALS, ŠARʾUGAL_NUMERALS)
+  add_simple_compositions(compositions, 'šarkid', ŠARKID_NUMERALS)
+
+  # Referring to Neo-Sumerian / Old Babylonian sexagesimal positions by name.
+  add_sexagesimal_compositions(compositions, 'geš2', GÉŠ_NUMERALS, GEŠʾU_NUMERALS)
+  add_sexagesimal_compositions(compositions, 'šar2', ŠÁR_NUMERALS, ŠARʾU_NUMERALS)
+  add_sexagesimal_compositions(compositions, 'šargal', ŠARGAL_NUMERALS, ŠARʾUGAL_NUMERALS)
+
+  # Referring to signs by by name (except DIŠ since it is our default).
+  add_simple_compositions(compositions, 'aš', AŠ_NUMERALS)
+  add_simple_compositions(compositions, 'u', U_NUMERALS)
+  add_simple_compositions(compositions, 'burʾu', BURʾU_NUMERALS)
+  add_simple_compositions(compositions, 'gešu', GEŠʾU_NUMERALS)
+  add_simple_compositions(compositions, 'šarʾu', ŠARʾU_NUMERALS)
+  add_simple_compositions(compositions, 'šarʾugal', ŠARʾUGAL_NUMERALS)
+  return compositions
+
+@functools.cache
+def build_compositions_by_sign():
+  compositions_by_sign = {}
+  for composition, sign in build_compositions().items():
+    compositions_by_sign.setdefault(sign, []).append(composition)
+  return compositions_by_sign
+
+def __getattr__(name):
+  # The compositions are module attributes for compatibility, but they are
+  # only built when first needed.
+  if name == 'compositions':
+    return build_compositions()
+  if name == 'compositions_by_sign':
+    return build_compositions_by_sign()
+  raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+# On-demand composition of numerals.  The compositions above enumerate every
+# numeral up to 59 of each unit; the following parses any numeral, including
+# those spanning multiple sexagesimal places, such as 75 or 125šar2.
+
+# The places of the counting systems, from the lowest, as (units, tens) tables;
+# 60 of a place make one of the next.
+SEXAGESIMAL_PLACES = [
+  (DIŠ_NUMERALS, U_NUMERALS),
+  (GÉŠ_NUMERALS, GEŠʾU_NUMERALS),
+  (ŠÁR_NUMERALS, ŠARʾU_NUMERALS),
+  (ŠARGAL_NUMERALS, ŠARʾUGAL_NUMERALS),
+]
+
+SEXAGESIMAL_UNITS = {
+  '': SEXAGESIMAL_PLACES,
+  'geš2': SEXAGESIMAL_PLACES[1:],
+  'šar2': SEXAGESIMAL_PLACES[2:],
+  'šargal': SEXAGESIMAL_PLACES[3:],
+  # 60 bur₃ make a šar₂.
+  'bur3': [(BÙR_NUMERALS, BURʾU_NUMERALS)] + SEXAGESIMAL_PLACES[2:],
+}
+
+SIMPLE_UNITS = {
+  '': BASIC_FRACTIONS,
+  'ban2': BÁN_NUMERALS,
+  'barig': BARIG_NUMERALS,
+  'iku': {**IKU_FRACTIONS, **dict(enumerate(IKU_NUMERALS))},
+  'eše3': ÈŠE_NUMERALS,
+  'šarkid': ŠARKID_NUMERALS,
+  'aš': AŠ_NUMERALS,
+  'u': U_NUMERALS,
+  'burʾu': BURʾU_NUMERALS,
+  'gešu': GEŠʾU_NUMERALS,
+  'šarʾu': ŠARʾU_NUMERALS,
+  'šarʾugal': ŠARʾUGAL_NUMERALS,
+}
+
+NUMERAL_COMPOSITION = re.compile(
+    r'^(\d+(?:/\d+)?)(%s)?(?:v(\d+))?$' % '|'.join(
+        sorted((unit for unit in set(SEXAGESIMAL_UNITS) | set(SIMPLE_UNITS)
+                if unit), key=len, reverse=True)))
+
+def sexagesimal_variants(n, places):
+  """Returns the variants of the sign sequence for n in a counting system with
+  the given places, or None if n is out of range.  The variants are ordered as
+  in add_sexagesimal_compositions, the higher places varying slowest."""
+  digits = []
+  for place in places:
+    n, digit = divmod(n, 60)
+    digits.append((place, digit))
+  if n:
+    return None
+  variants = ['']
+  for (units_sequence, tens_sequence), digit in reversed(digits):
+    if not digit:
+      continue
+    tens, units = divmod(digit, 10)
+    variants = [variant + tens_sign + units_sign
+                for variant in variants
+                for tens_sign in tens_sequence[tens] or ['']
+                for units_sign in units_sequence[units] or ['']]
+  return variants
+
+def numeral_variants(composition):
+  """Returns the list of the variants of the sign sequence for a numeric
+  composition such as 37šar2, 2barig, 1/2, or 75, or None if composition is not
+  a numeral.  If the composition has a vN suffix, the list has only that
+  variant.  Unlike compositions, this handles numerals of any magnitude
+  expressible with the signs of its unit."""
+  match = NUMERAL_COMPOSITION.match(composition)
+  if not match:
+    return None
+  number, unit, variant = match.groups()
+  unit = unit or ''
+  variants = None
+  if '/' in number:
+    variants = SIMPLE_UNITS.get(unit, {}).get(number)
+  elif unit in SEXAGESIMAL_UNITS:
+    if int(number):
+      variants = sexagesimal_variants(int(number), SEXAGESIMAL_UNITS[unit])
+  else:
+    sequence = SIMPLE_UNITS[unit]
+    if isinstance(sequence, dict):
+      variants = sequence.get(int(number))
+    elif int(number) < len(sequence):
+      variants = sequence[int(number)]
+  if not variants:
+    return None
+  if variant is None:
+    return list(variants)
+  if int(variant) < len(variants):
+    return [variants[int(variant)]]
+  return None
+
+def numeral_sign(composition):
+  """Returns the sign sequence for a numeric composition, as it would be found
+  in compositions, or None."""
+  variants = numeral_variants(composition)
+  return variants[0] if variants else None
+
+# Batch conversion of numbers to numerals, for typesetting tables.
+
+# Indices of the variants in the tables above; where a digit has only one form,
+# that form is used regardless.
+THREE_ROW = 0
+TWO_ROW = 1
+
+def place_digits(units_sequence, tens_sequence, variant):
+  """Returns the list of the 60 digits of the place with the given tables, the
+  digit 0 being the empty string."""
+  def pick(variants):
+    return variants[min(variant, len(variants) - 1)] if variants else ''
+  return [pick(tens_sequence[tens]) + pick(units_sequence[units])
+          for tens in range(6) for units in range(10)]
+
+@functools.cache
+def positional_digits(variant):
+  """Returns the 60 digits of the positional system in the given variant."""
+  return place_digits(DIŠ_NUMERALS, U_NUMERALS, variant)
+
+@functools.cache
+def counting_digits(variant):
+  """Returns the digits of each place of the counting system, from the lowest,
+  in the given variant."""
+  return [place_digits(units_sequence, tens_sequence, variant)
+          for units_sequence, tens_sequence in SEXAGESIMAL_PLACES]
+
+def sexagesimal_digits(number, max_fraction_places):
+  """Returns the sexagesimal digits of the integer part of number, most
+  significant first, and those of its fractional part, truncated to
+  max_fraction_places.  number may be anything with an as_integer_ratio, e.g.,
+  a float or a fractions.Fraction."""
+  numerator, denominator = number.as_integer_ratio()
+  if numerator < 0:
+    raise ValueError('No numeral for negative %s' % number)
+  integer_part, remainder = divmod(numerator, denominator)
+  integer_digits = []
+  while integer_part:
+    integer_part, digit = divmod(integer_part, 60)
+    integer_digits.append(digit)
+  integer_digits.reverse()
+  fraction_digits = []
+  while remainder and len(fraction_digits) < max_fraction_places:
+    digit, remainder = divmod(remainder * 60, denominator)
+    fraction_digits.append(digit)
+  return integer_digits, fraction_digits
+
+def positional_numerals(numbers, variant=THREE_ROW, separator=' ',
+                        max_fraction_places=4):
+  """Returns the numerals of the sexagesimal positional system for numbers, an
+  iterable of integers or of fractions (Fraction, float, or anything with an
+  as_integer_ratio).  As in the sources, there is neither a zero nor a sexagesimal
+  point; the places are joined by separator, so that an empty place shows as a
+  double separator.  Fractions that do not terminate within
+  max_fraction_places are truncated."""
+  digits = positional_digits(variant)
+  numerals = []
+  for number in numbers:
+    if isinstance(number, int):
+      if number < 0:
+        raise ValueError('No numeral for negative %s' % number)
+      places = []
+      while number:
+        number, digit = divmod(number, 60)
+        places.append(digits[digit])
+      places.reverse()
+    else:
+      integer_digits, fraction_digits = sexagesimal_digits(
+          number, max_fraction_places)
+      places = [digits[digit] for digit in integer_digits + fraction_digits]
+    numerals.append(separator.join(places))
+  return numerals
+
+def counting_numerals(numbers, variant=THREE_ROW):
+  """Returns the numerals of the Neo-Sumerian / Old Babylonian counting system
+  for numbers, an iterable of nonnegative integers less than 60⁴; the places
+  are written with their own signs (GÉŠ, ŠÁR, etc.), so no separator is
+  needed."""
+  places = counting_digits(variant)
+  limit = 60 ** len(places)
+  numerals = []
+  for number in numbers:
+    try:
+      integer = int(number)
+    except (TypeError, ValueError):
+      raise ValueError('No counting numeral for %s' % number)
+    # int truncates 2.7 to 2.
+    if not isinstance(number, str) and integer != number:
+      raise ValueError('No counting numeral for %s' % number)
+    number = integer
+    if not 0 <= number < limit:
+      raise ValueError('No counting numeral for %s' % number)
+    numeral = ''
+    for place_digits in places:
+      if not number:
+        break
+      number, digit = divmod(number, 60)
+      numeral = place_digits[digit] + numeral
+    numerals.append(numeral)
+  return numerals
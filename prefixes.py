@@ -0,0 +1,148 @@
+"""The shortest prefixes by which the compositions of a dictionary can be
+entered, so that the input method may commit or promote a candidate early.
+
+For each composition, the unique prefix is the shortest prefix of it which no
+other composition has; once it is typed, the input method may commit the sign
+without waiting for the rest of the composition nor for a space.  There is
+none if the composition is the prefix of another, as du is of du2.  The top
+prefix is the shortest prefix for which the composition is the first
+candidate in the order of the input method (see collation.py); a space then
+enters the sign.  The build writes them to PREFIXES, a JSON object mapping
+each composition to an object with "sign", "unique_prefix", and "top_prefix",
+the latter two possibly null, together with the statistics of the keystrokes
+saved.
+"""
+import argparse
+import json
+import os
+
+import collation
+import dictionary
+
+PREFIXES = "prefixes.json"
+
+
+def common_prefix_length(a, b):
+  n = 0
+  for x, y in zip(a, b):
+    if x != y:
+      break
+    n += 1
+  return n
+
+
+def build_prefix_table(compositions, key=collation.collation_key):
+  """Returns the map from composition to its sign, unique prefix, and top
+  prefix, for compositions, a map from composition to sign, with the candidates
+  in the order of key (that of the input method by default)."""
+  ordered = sorted(compositions)
+  # The first candidate among the compositions starting with each prefix.
+  keys = {composition: key(composition) for composition in ordered}
+  top_by_prefix = {}
+  for composition in ordered:
+    for n in range(1, len(composition) + 1):
+      top = top_by_prefix.get(composition[:n])
+      if top is None or keys[composition] < keys[top]:
+        top_by_prefix[composition[:n]] = composition
+
+  table = {}
+  for i, composition in enumerate(ordered):
+    # The compositions sharing the longest prefix with this one are its
+    # neighbours in lexicographic order.
+    shared = max(
+        common_prefix_length(composition, ordered[i - 1]) if i > 0 else 0,
+        common_prefix_length(composition, ordered[i + 1])
+        if i + 1 < len(ordered) else 0)
+    table[composition] = {
+        "sign": compositions[composition],
+        "unique_prefix": (composition[:shared + 1]
+                          if shared < len(composition) else None),
+        "top_prefix": next((composition[:n]
+                            for n in range(1, len(composition) + 1)
+                            if top_by_prefix[composition[:n]] == composition),
+                           None),
+    }
+  return table
+
+
+def entry_keystrokes(composition, entry):
+  """Returns the keystrokes needed to enter composition, whose entry in a
+  prefix table is given, by each of the strategies of keystroke_statistics."""
+  full = len(composition) + 1
+  unique = len(entry["unique_prefix"]) if entry["unique_prefix"] else full
+  top = len(entry["top_prefix"]) + 1 if entry["top_prefix"] else full
+  return {"full": full, "unique_prefix": unique, "top_prefix": top,
+          "best": min(full, unique, top)}
+
+
+def keystroke_statistics(table, weights=None):
+  """Returns the keystrokes needed to enter every composition of table once
+  (or as many times as its weight, if weights, a map from composition to
+  weight, is given): in full, followed by a space; committing at the unique
+  prefix; typing the top prefix followed by a space; and the best of those.
+  Each with the mean per composition, and the proportion saved with respect to
+  typing in full."""
+  totals = {"full": 0, "unique_prefix": 0, "top_prefix": 0, "best": 0}
+  count = 0
+  for composition, entry in table.items():
+    weight = 1 if weights is None else weights.get(composition, 0)
+    for strategy, keystrokes in entry_keystrokes(composition, entry).items():
+      totals[strategy] += weight * keystrokes
+    count += weight
+  return {
+      "compositions": len(table),
+      "without_unique_prefix": sum(1 for entry in table.values()
+                                   if entry["unique_prefix"] is None),
+      "without_top_prefix": sum(1 for entry in table.values()
+                                if entry["top_prefix"] is None),
+      "keystrokes": {
+          strategy: {
+              "total": total,
+              "mean": total / count if count else 0,
+              "saved": 1 - total / totals["full"] if totals["full"] else 0,
+          } for strategy, total in totals.items()},
+  }
+
+
+def write_prefixes(table, directory):
+  """Writes table and its statistics to PREFIXES in directory, and returns
+  its path."""
+  os.makedirs(directory, exist_ok=True)
+  path = os.path.join(directory, PREFIXES)
+  dictionary.write_atomically(
+      path,
+      json.dumps({"statistics": keystroke_statistics(table),
+                  "prefixes": table},
+                 ensure_ascii=False, indent=0).encode("utf-8"))
+  return path
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Prints the keystrokes saved by committing or promoting the "
+                  "candidates at their shortest prefixes, and optionally "
+                  "writes the prefixes.")
+  parser.add_argument("dictionary", nargs="?",
+                      default=os.path.join("Samples", "IME", "cpp",
+                                           "SampleIME", "Dictionary",
+                                           "sign_list.txt"),
+                      help="the dictionary, in any of its formats")
+  parser.add_argument("-o", "--output-directory",
+                      help="directory in which to write " + PREFIXES)
+  args = parser.parse_args()
+
+  table = build_prefix_table(dictionary.read_dictionary(args.dictionary))
+  statistics = keystroke_statistics(table)
+  print(f"{statistics['compositions']} compositions, "
+        f"{statistics['without_unique_prefix']} without unique prefix, "
+        f"{statistics['without_top_prefix']} never first candidate")
+  print(f"{'strategy':16}{'keystrokes':>12}{'mean':>8}{'saved':>8}")
+  for strategy, keystrokes in statistics["keystrokes"].items():
+    print(f"{strategy:16}{keystrokes['total']:>12}{keystrokes['mean']:>8.2f}"
+          f"{keystrokes['saved']:>8.1%}")
+  if args.output_directory:
+    write_prefixes(table, args.output_directory)
+
+
+if __name__ == "__main__":
+  main()
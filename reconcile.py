@@ -0,0 +1,154 @@
+"""The reconciliation of the OGSL and Šašková dictionaries, maps from
+composition to sign, into one dictionary, with a report of their differences.
+
+The compositions are compared by their values, without the disambiguators
+which the sign lists add to them, so that a value which the lists number
+differently is reported rather than entered twice; the other tools use the
+same normalization to find the values which can only be entered with a
+disambiguator.
+"""
+import argparse
+import json
+import os
+import re
+
+import dictionary
+
+# A disambiguator of a composition.  Šašková’s readings are disambiguated by
+# the initial of their source when the sign lists disagree (see
+# read_sign_list.py), OGSL’s and ours by v1, v2, etc.; the + or - for the ⁺ or
+# ⁻ of OGSL values such as gir₅⁻ and dun₃⁺ is counted as one too.  homophones.py
+# splits the compositions with the same pattern.
+DISAMBIGUATOR_PATTERN = r"(?:[MLA+-]|v\d+)"
+DISAMBIGUATOR = re.compile(DISAMBIGUATOR_PATTERN + "+$")
+
+
+def normalize_composition(composition):
+  """Returns the value of composition without its disambiguators, so that
+  dun3, dun3v1, dun3M, and dun3+ all become dun3."""
+  return DISAMBIGUATOR.sub("", composition).lower() or composition
+
+
+def is_list_number(composition):
+  # Only the OGSL dictionary has entry by sign list number; those are not
+  # readings.
+  return composition.startswith("x") and any(c.isdigit() for c in composition)
+
+
+def disambiguated_values(compositions):
+  """Returns the map from each value which is not itself a composition to the
+  compositions which disambiguate it, e.g., from dux to duxv1, duxv2, …; a
+  value so disambiguated cannot be entered without its disambiguator."""
+  candidates_by_value = {}
+  for composition in compositions:
+    if is_list_number(composition):
+      continue
+    value = normalize_composition(composition)
+    if value != composition and value not in compositions:
+      candidates_by_value.setdefault(value, []).append(composition)
+  return candidates_by_value
+
+
+def index(compositions):
+  """Returns the compositions indexed by (normalized value, sign), as a map
+  from that pair to the list of compositions, and by sign."""
+  by_value_and_sign = {}
+  by_sign = {}
+  for composition, sign in compositions.items():
+    if is_list_number(composition):
+      continue
+    by_value_and_sign.setdefault(
+        (normalize_composition(composition), sign), []).append(composition)
+    by_sign.setdefault(sign, []).append(composition)
+  return by_value_and_sign, by_sign
+
+
+def reconcile(ogsl, šašková):
+  """Joins the OGSL and Šašková dictionaries, maps from composition to sign.
+  Returns the merged dictionary, where OGSL wins any conflict, and a report of
+  the differences.  The merged dictionary has the values of signs which are
+  only in Šašková, except those which OGSL has only with a disambiguator.
+  Linear in the size of the dictionaries."""
+  merged = dict(ogsl)
+  report = {
+    # Same composition, different signs.
+    "sign_conflicts": [],
+    # A value of a sign in only one of the lists.
+    "only_in_ogsl": [],
+    "only_in_šašková": [],
+    # The same value of the same sign is typed differently.
+    "variant_numbering": [],
+    # Signs which have values in only one of the lists.
+    "signs_only_in_ogsl": [],
+    "signs_only_in_šašková": [],
+  }
+
+  ogsl_by_value_and_sign, ogsl_by_sign = index(ogsl)
+  šašková_by_value_and_sign, šašková_by_sign = index(šašková)
+  ogsl_disambiguated_values = disambiguated_values(ogsl)
+  for composition, sign in šašková.items():
+    if composition in ogsl:
+      if ogsl[composition] != sign:
+        report["sign_conflicts"].append(
+            {"composition": composition,
+             "ogsl": ogsl[composition],
+             "šašková": sign})
+    # A value of a sign which OGSL has, perhaps under another disambiguator,
+    # and a value which OGSL only has disambiguated, would make the entry of
+    # the OGSL compositions ambiguous again.
+    elif ((normalize_composition(composition), sign)
+          not in ogsl_by_value_and_sign and
+          composition not in ogsl_disambiguated_values):
+      merged[composition] = sign
+
+  for key, ogsl_compositions in ogsl_by_value_and_sign.items():
+    value, sign = key
+    šašková_compositions = šašková_by_value_and_sign.get(key)
+    if šašková_compositions is None:
+      report["only_in_ogsl"].append(
+          {"value": value, "sign": sign, "compositions": ogsl_compositions})
+    elif sorted(ogsl_compositions) != sorted(šašková_compositions):
+      report["variant_numbering"].append(
+          {"value": value, "sign": sign,
+           "ogsl": ogsl_compositions, "šašková": šašková_compositions})
+  for key, šašková_compositions in šašková_by_value_and_sign.items():
+    if key not in ogsl_by_value_and_sign:
+      value, sign = key
+      report["only_in_šašková"].append(
+          {"value": value, "sign": sign, "compositions": šašková_compositions})
+
+  for sign, compositions in ogsl_by_sign.items():
+    if sign not in šašková_by_sign:
+      report["signs_only_in_ogsl"].append(
+          {"sign": sign, "compositions": compositions})
+  for sign, compositions in šašková_by_sign.items():
+    if sign not in ogsl_by_sign:
+      report["signs_only_in_šašková"].append(
+          {"sign": sign, "compositions": compositions})
+
+  return merged, report
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Merges the dictionaries produced by read_ogsl.py and "
+                  "read_sign_list.py and reports their differences.")
+  parser.add_argument("ogsl", help="dictionary written by read_ogsl.py")
+  parser.add_argument("šašková", help="dictionary written by read_sign_list.py")
+  parser.add_argument("-o", "--output-directory", default="reconciled",
+                      help="directory in which to write the merged dictionary "
+                           "and reconciliation.json")
+  args = parser.parse_args()
+
+  merged, report = reconcile(dictionary.read_dictionary(args.ogsl),
+                             dictionary.read_dictionary(args.šašková))
+  dictionary.write_dictionary(merged, args.output_directory)
+  dictionary.write_atomically(
+      os.path.join(args.output_directory, "reconciliation.json"),
+      json.dumps(report, ensure_ascii=False, indent=1).encode("utf-8"))
+  for kind, entries in report.items():
+    print(f"{kind}: {len(entries)}")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,311 @@
+﻿import concurrent.futures
+import csv
+import functools
+import hashlib
+import os
+import pickle
+import re
+import sys
+
+import instrumentation
+import numerals
+import sign_list_rows
+from diagnostics import Diagnostics
+from sign_list_rows import (Reading, is_composition_character, numbered_rows,
+                            readings_from_row)
+
+# Bump whenever Reading or the layout of the snapshot changes.
+SNAPSHOT_VERSION = 1
+
+CACHE_DIRECTORY = '.cache'
+
+def reading_tuples_from_row(numbered_row, collect_all=False):
+  """Returns the readings_from_row as tuples, and the error if collect_all and
+  the row is malformed, since the diagnostics live in the parent process."""
+  try:
+    return [reading.as_tuple()
+            for reading in readings_from_row(*numbered_row)], None
+  except (ValueError, KeyError) as e:
+    if not collect_all:
+      raise
+    return [], repr(e)
+
+def read_šašková_readings(path, jobs=1, diagnostics=None, profile=None):
+  """Returns the readings of the CSV at the given path.  If jobs is not 1, the
+  rows are transformed in that many processes (as many as there are cores if
+  jobs is None); the numbering of the rows, on which the variant numbering
+  depends, is sequential in any case, and the results are merged in row order.
+  The reading of the rows and their transformation are recorded as stages of
+  profile, if any; the memory of the worker processes is not traced.
+  """
+  if diagnostics is None:
+    diagnostics = Diagnostics()
+  if profile is None:
+    profile = instrumentation.Profile('sign_list', enabled=False)
+  with profile.stage('CSV rows') as stage:
+    with open(path, encoding="utf-8") as file:
+      rows = list(numbered_rows(csv.reader(file), diagnostics))
+    stage['items'] = len(rows)
+  transform = functools.partial(reading_tuples_from_row,
+                                collect_all=diagnostics.collect_all)
+
+  def merge(results):
+    readings = []
+    for (row, meszl, row_index), (reading_tuples, error) in zip(rows, results):
+      if error:
+        diagnostics.error('Malformed row', 'MesZL %s: %s' % (meszl, error))
+      readings += (Reading.from_tuple(t) for t in reading_tuples)
+    return readings
+
+  with profile.stage('row transformation') as stage:
+    if jobs == 1:
+      readings = merge(map(transform, rows))
+    else:
+      jobs = jobs or os.cpu_count()
+      with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        # Executor.map yields the results in the order of rows, i.e., by
+        # row_index.
+        readings = merge(executor.map(transform, rows,
+                                      chunksize=len(rows) // (4 * jobs) + 1))
+    stage['items'] = len(readings)
+  return readings
+
+def snapshot_key(path):
+  # The rules are the code of sign_list_rows, so a change to any of its
+  # rewrites invalidates the snapshot, as does a change to the CSV itself; a
+  # change to the disambiguation in this module does not.
+  key = hashlib.sha256()
+  for input_path in (path, sign_list_rows.__file__):
+    with open(input_path, 'rb') as file:
+      key.update(hashlib.sha256(file.read()).digest())
+  return key.hexdigest()
+
+def load_šašková_readings(path, cache_directory=CACHE_DIRECTORY, jobs=1,
+                          diagnostics=None, profile=None):
+  """Returns the readings of the CSV at the given path, as computed by
+  read_šašková_readings, from a snapshot in cache_directory if there is an
+  up-to-date one; otherwise the snapshot is written, unless there were errors.
+  No caching happens if cache_directory is None."""
+  if diagnostics is None:
+    diagnostics = Diagnostics()
+  if profile is None:
+    profile = instrumentation.Profile('sign_list', enabled=False)
+  if cache_directory is None:
+    return read_šašková_readings(path, jobs, diagnostics, profile)
+  with profile.stage('snapshot') as stage:
+    key = snapshot_key(path)
+    snapshot_path = os.path.join(
+        cache_directory,
+        'sign_list.v%d.%s.pickle' % (SNAPSHOT_VERSION, key[:16]))
+    readings = None
+    try:
+      with open(snapshot_path, 'rb') as file:
+        snapshot = pickle.load(file)
+      if snapshot['version'] == SNAPSHOT_VERSION and snapshot['key'] == key:
+        readings = [Reading.from_tuple(t) for t in snapshot['readings']]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+      pass
+    stage['items'] = len(readings) if readings is not None else 0
+  if readings is not None:
+    return readings
+  readings = read_šašková_readings(path, jobs, diagnostics, profile)
+  if diagnostics:
+    return readings
+  os.makedirs(cache_directory, exist_ok=True)
+  temporary_path = snapshot_path + '.%d.tmp' % os.getpid()
+  with open(temporary_path, 'wb') as file:
+    pickle.dump({'version': SNAPSHOT_VERSION,
+                 'key': key,
+                 'readings': [reading.as_tuple() for reading in readings]},
+                file, protocol=pickle.HIGHEST_PROTOCOL)
+  os.replace(temporary_path, snapshot_path)
+  # The snapshots for earlier rules or CSVs will never be read again.
+  for name in os.listdir(cache_directory):
+    if (re.match(r'^sign_list\.v\d+\.[0-9a-f]+\.pickle$', name) and
+        name != os.path.basename(snapshot_path)):
+      try:
+        os.remove(os.path.join(cache_directory, name))
+      except OSError:
+        pass
+  return readings
+
+def index_readings_by_composition(readings_by_sign):
+  readings_by_composition = {}
+  for readings in readings_by_sign.values():
+    for reading in readings:
+      readings_by_composition.setdefault(reading.composition(), []).append(reading)
+  return readings_by_composition
+
+def sign_name(sign, readings_by_sign):
+  return readings_by_sign[sign][0].value
+
+def print_readings(value, readings, readings_by_sign, by_source=False):
+  print(value, file=sys.stderr)
+  for reading in readings:
+    print('    ', reading.source.ljust(6) if by_source else ('...' + reading.disambiguator.ljust(8)),
+          reading.sign, sign_name(reading.sign, readings_by_sign), 8 * ' ', reading.comment, file=sys.stderr)
+
+def build_compositions(readings, diagnostics=None, numeral_compositions=None):
+  """Returns the map from composition to sign for the given readings of the
+  CSV, together with our numbers, punctuation, and determinatives, after
+  disambiguating the compositions.  The numbers are numeral_compositions, if
+  given, which should have been validated; otherwise those of numerals, which
+  are validated here."""
+  if diagnostics is None:
+    diagnostics = Diagnostics()
+  readings_by_value = {}
+  readings_by_sign = {}
+  for reading in readings:
+    readings_by_value.setdefault(reading.value, []).append(reading)
+    readings_by_sign.setdefault(reading.sign, []).append(reading)
+
+  # Insert the numbers which we listed ourselves.
+  if numeral_compositions is None:
+    try:
+      numerals.validate()
+    except ValueError as e:
+      diagnostics.error('Numerals', e)
+    numeral_compositions = numerals.compositions
+  numeral_compositions_by_sign = {}
+  for composition, sign in numeral_compositions.items():
+    numeral_compositions_by_sign.setdefault(sign, []).append(composition)
+  for sign, compositions in numeral_compositions_by_sign.items():
+    for composition in compositions:
+      reading = Reading(sign, šašková_index=None)
+      reading.value = composition
+      readings_by_value.setdefault(reading.composition, []).append(reading)
+      readings_by_sign.setdefault(reading.sign, []).append(reading)
+
+  # Punctuation and common determinatives.
+  for sign, compositions in {
+      # MesZL 592.
+      '𒑱' : [':'],
+      # MesZL 576: Trennungszeichen (wie n592; Umschrift :).  Disunified from GAM
+      # in Unicode.
+      '𒑲' : [':v1'],
+      # MesZL 577: Trennungs- und Wiederholungszeichen (Umschrift mit Parpola,
+      # LASEA pXX ⫶).  Disunified from ILIMMU4 in Unicode.
+      '𒑳' : ['⫶'],
+      # Word divider.  See MesZL 748, p. 418: In Kültepe wird ein senkrechter Keil
+      # als Worttrenner gebraucht.  Disunified from DIŠ in Unicode.
+      # See AAA 1/3, 01 for an example usage:
+      # https://cdli.ucla.edu/search/archival_view.php?ObjectID=P360975.
+      # We use the transcription convention from CDLI, a forward slash.
+      '𒑰' : ['/'],
+      # Determinatives for personal names and gods.
+      '𒁹' : ['m'],
+      '𒊩' : ['f'],
+      '𒀭' : ['d'],
+    }.items():
+    for composition in compositions:
+      reading = Reading(sign, šašková_index=None)
+      reading.value = composition
+      readings_by_value.setdefault(reading.composition, []).append(reading)
+      readings_by_sign.setdefault(reading.sign, []).append(reading)
+
+  for value, readings in readings_by_value.items():
+    if len(readings) > 1:
+      # Duplicates, with inconsistent duplicates explicitly listed.
+      for reading in readings:
+        if not reading.keep:
+          continue
+        for other in readings:
+          if other.keep and other.sign == reading.sign and other is not reading:
+            if (other.keep and
+                ((other.comment and reading.comment and other.comment != reading.comment) or
+                 (other.source and reading.source and other.source != reading.source)) and
+                (value, sign_name(reading.sign, readings_by_sign)) not in (
+                    # One entry is a superset of the other.
+                    ('IL', 'AL x ŠE'),
+                    # The comments on these Labat readings are inconsistent
+                    # (MesZL: AŠLAG missing vs. MesZL: AŠLAG = TUG2.UD), the
+                    # latter being right.
+                    ('AŠLAG', 'GIŠ.TUG2.PI.KAR'),
+                    # MesZL and Labat readings in agreement, with a ? from MesZL.
+                    ('GAMBI', 'MUNUS.UŠ.DI'),
+                    # MesZL 905 and 906 unified in Unicode (as in Labat).
+                    ('MUR7', 'SIG4'),
+                    # Duplicate entries for variants of TA×ḪI unified by Unicode
+                    # as 𒋭.  They differ only by their comment.
+                    ('ALAMMUŠ', 'LAL3'),
+                    ('ALAMUŠ', 'LAL3'),
+                )):
+              print_readings(value, readings, readings_by_sign, by_source=True)
+              diagnostics.error('Inconsistent duplicate readings',
+                                'Inconsistent duplicate readings %s' % value)
+            other.keep = False
+      # Ambiguous readings coming from inconsistency between sign lists.
+      if any(reading.source and reading.source != 'MesZL' for reading in readings):
+        undetermined_source = False
+        for reading in readings:
+          if not reading.source:
+            implicit_meszl = any(
+                re.match(
+                    other.comment,
+                    'MesZL: (\w+, *)*%s(, *\w+)* = %s' % (value, readings_by_sign[reading.sign][0].value))
+                for other in readings)
+            if implicit_meszl:
+              reading.source = 'MesZL'
+            else:
+              print_readings(value, readings, readings_by_sign, by_source=True)
+              diagnostics.error('Divergent readings',
+                                'Divergent readings with undetermined source %s' % value)
+              undetermined_source = True
+        if undetermined_source:
+          continue
+        if not all(reading.source == readings[0].source for reading in readings):
+          for reading in readings:
+            reading.disambiguator += reading.source[0]
+
+  for reading_dict in (readings_by_sign,
+                       readings_by_value):
+    filtered_dict = {
+        key: [reading for reading in readings if reading.keep]
+        for key, readings in reading_dict.items()
+    }
+    reading_dict.clear()
+    reading_dict.update(filtered_dict)
+
+  readings_by_composition = index_readings_by_composition(readings_by_sign)
+
+  for readings in readings_by_composition.values():
+    if len(readings) > 1:
+      readings.sort(key=lambda r: r.šašková_index)
+      i = 0
+      for reading in readings:
+        if i:
+          reading.disambiguator += 'v%d' % i
+        i += 1
+
+  readings_by_composition = index_readings_by_composition(readings_by_sign)
+
+  for composition, readings in readings_by_composition.items():
+    if len(readings) > 1:
+      print_readings(composition, readings, readings_by_sign)
+      diagnostics.error('Ambiguous composition',
+                        'Ambiguous composition %s' % composition)
+
+  # Sanity check of numbers: 1meow and meow must map to the same sign.
+  for composition, readings in readings_by_composition.items():
+    if re.match('^1\D', composition):
+      if composition[1:] in readings_by_composition:
+        if readings[0].sign != readings_by_composition[composition[1:]][0].sign:
+          if composition in ('1iku', '1buru'):
+            # Borger gives iku as a reading for 𒃷 in 𒀸𒃷.  Friberg sees that as
+            # a determinative, and transcribes it 1iku GAN2.  Shrug.
+            # Buru seems wtf.
+            continue
+          print_readings(composition, readings, readings_by_sign)
+          print_readings(composition[1:], readings_by_composition[composition[1:]], readings_by_sign)
+          diagnostics.error('Inconsistent numeric readings',
+                            'Inconsistent numeric readings %s' % composition)
+
+  compositions = {}
+  for composition, readings in readings_by_composition.items():
+    if (not all(is_composition_character(c.lower()) for c in composition) or
+        composition.startswith('x')):
+      # TODO(egg): composition.startswith('x') is a cheesy way to eliminate xv,
+      # which happens to be the only reading wherein x is not ₓ at this point.
+      continue
+    compositions[composition] = readings[0].sign
+  return compositions
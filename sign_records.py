@@ -0,0 +1,186 @@
+"""The records of the encoded signs, with everything that the build knows about
+each of them, for a sign information panel or tooltip.
+
+A record is a JSON object keyed by encoding, with
+  "encoding"        the sign, one or more codepoints;
+  "codepoints"      their scalar values, as U+XXXXX;
+  "unicode_names"   their Unicode names, without CUNEIFORM SIGN;
+  "ogsl_names"      the names of the OGSL signs with that encoding;
+  "form_names"      the names of the OGSL forms (@form) with that encoding;
+  "related_forms"   the forms of those signs, and the signs of those forms, as
+                    objects with "relation" ("form" or "sign"), "name", and
+                    "encoding";
+  "values"          the compositions of the OGSL dictionary for the sign, i.e.,
+                    its values with their v disambiguators, list numbers, etc.;
+  "šašková_values"  those of the dictionary of Šašková;
+  "list_numbers"    the numbers of the sign in the sign lists, as in the OGSL,
+                    e.g., MZL839, ŠL579, aBZL415.
+The build writes them to SIGN_RECORDS; SignRecords loads them with indexes by
+value, list number, OGSL name, and Unicode name.
+"""
+import argparse
+import json
+import os
+import sys
+import unicodedata
+
+import dictionary
+import reconcile
+
+SIGN_RECORDS = "sign_records.json"
+
+
+def unicode_name(c):
+  return unicodedata.name(c, f"U+{ord(c):X}").replace("CUNEIFORM SIGN ", "")
+
+
+def build_records(model, ogsl_compositions, šašková_compositions=None):
+  """Returns the map from encoding to record for the forms of model, an
+  ogsl.Model with its fixups applied, and the dictionaries built from it and
+  from the list of Šašková, maps from composition to sign."""
+  records = {}
+
+  def record(encoding):
+    if encoding not in records:
+      records[encoding] = {
+          "encoding": encoding,
+          "codepoints": [f"U+{ord(c):X}" for c in encoding],
+          "unicode_names": [unicode_name(c) for c in encoding],
+          "ogsl_names": [],
+          "form_names": [],
+          "related_forms": [],
+          "values": [],
+          "šašková_values": [],
+          "list_numbers": [],
+      }
+    return records[encoding]
+
+  for name, forms in model.forms_by_name.items():
+    encoding = forms[0].codepoints
+    if not encoding or not all(ord(c) >= 0x12000 for c in encoding):
+      continue
+    r = record(encoding)
+    for form in forms:
+      names = r["form_names"] if form.form_id else r["ogsl_names"]
+      if name not in names:
+        names.append(name)
+      for list_number in form.lists:
+        if list_number not in r["list_numbers"]:
+          r["list_numbers"].append(list_number)
+      if form.form_id and form.sign.codepoints:
+        related = {"relation": "sign", "name": form.sign.name,
+                   "encoding": form.sign.codepoints}
+        if related not in r["related_forms"]:
+          r["related_forms"].append(related)
+        sign_record = record(form.sign.codepoints)
+        related = {"relation": "form", "name": name, "encoding": encoding}
+        if related not in sign_record["related_forms"]:
+          sign_record["related_forms"].append(related)
+
+  for key, compositions in (("values", ogsl_compositions),
+                            ("šašková_values", šašková_compositions or {})):
+    for composition, sign in sorted(compositions.items()):
+      record(sign)[key].append(composition)
+  return dict(sorted(records.items()))
+
+
+def write_records(records, directory):
+  """Writes records to SIGN_RECORDS in directory, and returns its path."""
+  os.makedirs(directory, exist_ok=True)
+  path = os.path.join(directory, SIGN_RECORDS)
+  dictionary.write_atomically(
+      path, json.dumps(records, ensure_ascii=False, indent=0).encode("utf-8"))
+  return path
+
+
+class SignRecords:
+  """The records written by write_records, with indexes from values (with
+  and without their disambiguators), list numbers, OGSL names, and Unicode
+  names to the encodings of the records.  The lookups are case-insensitive,
+  except for values."""
+
+  def __init__(self, records):
+    self.records = records
+    self.encodings_by_value = {}
+    self.encodings_by_list_number = {}
+    self.encodings_by_ogsl_name = {}
+    self.encodings_by_unicode_name = {}
+
+    def add(index, key, encoding):
+      encodings = index.setdefault(key, [])
+      if encoding not in encodings:
+        encodings.append(encoding)
+
+    for encoding, record in records.items():
+      for composition in record["values"] + record["šašková_values"]:
+        add(self.encodings_by_value, composition, encoding)
+        if not reconcile.is_list_number(composition):
+          add(self.encodings_by_value,
+              reconcile.normalize_composition(composition), encoding)
+      for list_number in record["list_numbers"]:
+        add(self.encodings_by_list_number, list_number.lower(), encoding)
+      for name in record["ogsl_names"] + record["form_names"]:
+        add(self.encodings_by_ogsl_name, name.lower(), encoding)
+      add(self.encodings_by_unicode_name,
+          " ".join(record["unicode_names"]).lower(), encoding)
+
+  @staticmethod
+  def load(path):
+    with open(path, encoding="utf-8") as f:
+      return SignRecords(json.load(f))
+
+  def record(self, encoding):
+    return self.records.get(encoding)
+
+  def _lookup(self, index, key):
+    return [self.records[encoding] for encoding in index.get(key, ())]
+
+  def by_value(self, value):
+    """The records of the signs with the given composition, e.g., du3v1, or
+    value, which stands for all its disambiguated compositions, e.g., dun3."""
+    return self._lookup(self.encodings_by_value, value)
+
+  def by_list_number(self, list_number):
+    return self._lookup(self.encodings_by_list_number, list_number.lower())
+
+  def by_ogsl_name(self, name):
+    return self._lookup(self.encodings_by_ogsl_name, name.lower())
+
+  def by_unicode_name(self, name):
+    return self._lookup(self.encodings_by_unicode_name,
+                        name.lower().replace("cuneiform sign ", ""))
+
+  def lookup(self, key):
+    """Returns the records for key, taken as an encoding, a value, a list
+    number, an OGSL name, or a Unicode name, in that order."""
+    if key in self.records:
+      return [self.records[key]]
+    for by in (self.by_value, self.by_list_number, self.by_ogsl_name,
+               self.by_unicode_name):
+      records = by(key)
+      if records:
+        return records
+    return []
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Prints the records of the signs with the given encodings, "
+                  "values, list numbers, OGSL names, or Unicode names.")
+  parser.add_argument("keys", nargs="+", metavar="key")
+  parser.add_argument("--records", default=os.path.join("reconciled",
+                                                        SIGN_RECORDS),
+                      help="the records written by build.py")
+  args = parser.parse_args()
+
+  records = SignRecords.load(args.records)
+  for key in args.keys:
+    found = records.lookup(key)
+    if not found:
+      print(f"{key}: no sign", file=sys.stderr)
+    for record in found:
+      print(json.dumps(record, ensure_ascii=False, indent=1))
+
+
+if __name__ == "__main__":
+  main()
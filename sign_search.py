@@ -0,0 +1,365 @@
+"""Structural search of the signs of the OGSL by their components.
+
+The OGSL names describe the structure of the signs: |KA×(A.BAD)| is KA with
+the sequence A.BAD inscribed in it, LAGAB@g is LAGAB gunû, |(GIŠ%GIŠ)&(GIŠ%GIŠ)|
+is two crossed GIŠ over two crossed GIŠ.  parse_name reads such a name as a
+tree of Components, and ComponentIndex answers queries given as patterns in
+the same syntax, where … (or * or ...) stands for any component:
+
+  LAGAB×…   the signs with LAGAB as the outer sign;
+  …@g       the gunû forms;
+  KA×(…)    everything containing KA times something;
+  A.…       A followed by any one component in a sequence.
+
+A pattern matches if it matches any part of a name, a sequence being matched
+by any run of its components, so that A.BAD matches |KA.A.BAD|.  The modifiers
+of a pattern (@g, ~a, etc.) must all be present where it matches, but the
+matched component may have others, so that LAGAB also matches LAGAB@g.
+"""
+import argparse
+import collections
+import contextlib
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+import ogsl
+from diagnostics import Diagnostics
+
+CACHE_DIRECTORY = os.path.join(".cache", "sign_search")
+
+# Bump whenever the layout of the cached index changes.
+CACHE_VERSION = 1
+
+WILDCARD = "…"
+
+# The operators joining the components of a sequence, and those binding more
+# tightly, with @ between two components being the opposing operator.
+SEQUENCE_OPERATORS = ".+:"
+BINARY_OPERATORS = "×&%@"
+
+# The binary operators by increasing precedence, those of a level associating
+# to the left: |A&B×C| is A over B times C.
+PRECEDENCE = ("&%", "@", "×")
+
+# The operator of a repetition such as 3×AN, three AN.
+REPETITION = "n×"
+SPECIAL_CHARACTERS = "|()~" + SEQUENCE_OPERATORS + BINARY_OPERATORS
+
+
+class Component(collections.namedtuple(
+    "Component", ("operator", "name", "modifiers", "operands"))):
+  """A node of the structure of a sign name.  A simple sign such as LAGAB@g
+  has no operator, its name, here LAGAB, and its modifiers, here ("g",); a
+  compound has an operator, one of SEQUENCE_OPERATORS or BINARY_OPERATORS, and
+  operands, the latter two in sequences of more than two.  A repetition such
+  as 3(DIŠ) has the operator "n", the count as its name, and one operand; so
+  has one such as 3×AN, with the operator REPETITION."""
+
+  def subcomponents(self):
+    """Yields this component and all of those it contains."""
+    yield self
+    for operand in self.operands:
+      yield from operand.subcomponents()
+
+  def atoms(self):
+    return set(component.name for component in self.subcomponents()
+               if component.operator is None and component.name != WILDCARD)
+
+  def __str__(self):
+    modifiers = "".join(m if m.startswith("~") else "@" + m
+                        for m in self.modifiers)
+    if self.operator is None:
+      return self.name + modifiers
+    if self.operator == "n":
+      return f"{self.name}({self.operands[0]}){modifiers}"
+    def operand(component):
+      return (f"({component})" if component.operator not in (None, "n")
+              else str(component))
+    if self.operator == REPETITION:
+      text = f"{self.name}×{operand(self.operands[0])}"
+      return f"({text}){modifiers}" if modifiers else text
+    text = self.operator.join(map(operand, self.operands))
+    return f"({text}){modifiers}" if modifiers else text
+
+
+def parse_name(name):
+  """Returns the Component for the OGSL name or pattern name.  Raises
+  ValueError if the name is malformed."""
+  text = name.strip("|").replace("...", WILDCARD).replace("*", WILDCARD)
+  i = 0
+
+  def peek():
+    return text[i] if i < len(text) else ""
+
+  def error(message):
+    return ValueError(f"{message} at {i} in {name}")
+
+  def modifiers():
+    nonlocal i
+    result = []
+    while True:
+      if peek() == "@" and i + 1 < len(text) and (
+          text[i + 1].islower() or text[i + 1].isdigit()):
+        i += 1
+        start = i
+        if text[i].isdigit():
+          while peek().isdigit():
+            i += 1
+        else:
+          i += 1
+        result.append(text[start:i])
+      elif peek() == "~":
+        i += 1
+        start = i
+        while peek() and peek().isalnum():
+          i += 1
+        if start == i:
+          raise error("Empty variant")
+        result.append("~" + text[start:i])
+      else:
+        return tuple(result)
+
+  def unary():
+    nonlocal i
+    if peek() == "(":
+      i += 1
+      inner = sequence()
+      if peek() != ")":
+        raise error("Unmatched parenthesis")
+      i += 1
+      inner_modifiers = modifiers()
+      return (inner._replace(modifiers=inner.modifiers + inner_modifiers)
+              if inner_modifiers else inner)
+    start = i
+    while peek() and peek() not in SPECIAL_CHARACTERS:
+      i += 1
+    if start == i:
+      raise error("Expected a component")
+    atom = text[start:i]
+    if peek() == "(" and atom.isdigit():
+      i += 1
+      inner = sequence()
+      if peek() != ")":
+        raise error("Unmatched parenthesis")
+      i += 1
+      return Component("n", atom, modifiers(), (inner,))
+    if peek() == "×" and atom.isdigit():
+      i += 1
+      return Component(REPETITION, atom, (), (unary(),))
+    return Component(None, atom, modifiers(), ())
+
+  def binary(level=0):
+    nonlocal i
+    if level == len(PRECEDENCE):
+      return unary()
+    left = binary(level + 1)
+    while peek() and peek() in PRECEDENCE[level]:
+      operator = peek()
+      i += 1
+      left = Component(operator, None, (), (left, binary(level + 1)))
+    return left
+
+  def sequence():
+    nonlocal i
+    left = binary()
+    while peek() and peek() in SEQUENCE_OPERATORS:
+      operator = peek()
+      i += 1
+      right = binary()
+      if left.operator == operator and not left.modifiers:
+        left = left._replace(operands=left.operands + (right,))
+      else:
+        left = Component(operator, None, (), (left, right))
+    return left
+
+  component = sequence()
+  if i != len(text):
+    raise error("Unexpected character")
+  return component
+
+
+def matches(pattern, component):
+  """Whether component, as a whole, matches the pattern."""
+  if not set(pattern.modifiers) <= set(component.modifiers):
+    return False
+  if pattern.operator is None and pattern.name == WILDCARD:
+    return True
+  return (pattern.operator == component.operator and
+          pattern.name == component.name and
+          len(pattern.operands) == len(component.operands) and
+          all(matches(p, c)
+              for p, c in zip(pattern.operands, component.operands)))
+
+
+def matches_part(pattern, component):
+  """Whether component matches the pattern as a whole or, if both are
+  sequences with the same operator, by a run of its operands; the modifiers of
+  a sequence apply to all of it, so a pattern with modifiers must match it
+  whole."""
+  if (pattern.operator is None or pattern.operator not in SEQUENCE_OPERATORS or
+      pattern.modifiers or pattern.operator != component.operator):
+    return matches(pattern, component)
+  n = len(pattern.operands)
+  return any(all(matches(p, c) for p, c in zip(pattern.operands,
+                                                component.operands[start:]))
+             for start in range(len(component.operands) - n + 1))
+
+
+SearchResult = collections.namedtuple(
+    "SearchResult", ("name", "encoding", "values"))
+
+
+def shape(component):
+  """The key under which ComponentIndex indexes a component, which must be
+  the same for any component matching a pattern that is not a wildcard; that
+  of a sequence leaves out its length, since it may match part of a longer
+  one."""
+  if component.operator is not None and (
+      component.operator in SEQUENCE_OPERATORS):
+    return component.operator, component.name, None
+  return component.operator, component.name, len(component.operands)
+
+
+class ComponentIndex:
+  """The structure of the names of the forms of the OGSL.  entries maps each
+  name to its Component, its encoding, and its values; every part of every
+  name is indexed by its shape and by its modifiers, and the names by the
+  simple signs they contain, so that a search only tries to match the parts
+  that can match the pattern."""
+
+  def __init__(self, entries):
+    self.entries = entries
+    self.components_by_shape = {}
+    self.components_by_modifier = {}
+    self.names_by_atom = {}
+    for name, (component, _, _) in entries.items():
+      for atom in component.atoms():
+        self.names_by_atom.setdefault(atom, set()).add(name)
+      for subcomponent in component.subcomponents():
+        self.components_by_shape.setdefault(
+            shape(subcomponent), []).append((name, subcomponent))
+        for modifier in subcomponent.modifiers:
+          self.components_by_modifier.setdefault(
+              modifier, []).append((name, subcomponent))
+
+  @staticmethod
+  def from_model(model, diagnostics=None):
+    """Returns the index of the forms of model; the names which cannot be
+    parsed are reported to diagnostics and left out."""
+    if diagnostics is None:
+      diagnostics = Diagnostics()
+    entries = {}
+    for name, forms in model.forms_by_name.items():
+      try:
+        component = parse_name(name)
+      except ValueError as e:
+        diagnostics.error("Unparsable name", e)
+        continue
+      values = sorted(set(value for form in forms for value in form.values))
+      entries[name] = (component, forms[0].codepoints, values)
+    return ComponentIndex(entries)
+
+  def search(self, pattern):
+    """Returns the SearchResults for the names matching pattern, a string or a
+    Component, sorted by name."""
+    if isinstance(pattern, str):
+      pattern = parse_name(pattern)
+    if pattern.operator is None and pattern.name == WILDCARD:
+      if pattern.modifiers:
+        candidates = self.components_by_modifier.get(pattern.modifiers[0], ())
+      else:
+        candidates = ((name, entry[0]) for name, entry in self.entries.items())
+    else:
+      candidates = self.components_by_shape.get(shape(pattern), ())
+    atoms = pattern.atoms()
+    if atoms:
+      allowed = set.intersection(*(self.names_by_atom.get(atom, set())
+                                   for atom in atoms))
+      candidates = ((name, component) for name, component in candidates
+                    if name in allowed)
+    names = set(name for name, component in candidates
+                if matches_part(pattern, component))
+    return [SearchResult(name, *self.entries[name][1:])
+            for name in sorted(names)]
+
+
+def index_key(path):
+  key = hashlib.sha256(str(CACHE_VERSION).encode("ascii"))
+  for input_path in (path, __file__, ogsl.__file__):
+    with open(input_path, "rb") as f:
+      key.update(hashlib.sha256(f.read()).digest())
+  return key.hexdigest()
+
+
+def load_index(path, cache_directory=CACHE_DIRECTORY, diagnostics=None):
+  """Returns the ComponentIndex of the OGSL file at path, with its fixups
+  applied, from a cached copy in cache_directory if there is an up-to-date
+  one.  No caching happens if cache_directory is None."""
+  if diagnostics is None:
+    diagnostics = Diagnostics()
+  if cache_directory is not None:
+    key = index_key(path)
+    cache_path = os.path.join(cache_directory, f"index.{key[:16]}.pickle")
+    try:
+      with open(cache_path, "rb") as f:
+        cached = pickle.load(f)
+      if cached["key"] == key:
+        return ComponentIndex(cached["entries"])
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+      pass
+  model = ogsl.parse_ogsl(path, diagnostics)
+  ogsl.apply_fixups(model, diagnostics)
+  index = ComponentIndex.from_model(model, diagnostics)
+  if cache_directory is not None:
+    os.makedirs(cache_directory, exist_ok=True)
+    temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+      pickle.dump({"key": key, "entries": index.entries}, f,
+                  protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, cache_path)
+  return index
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Finds the signs of the OGSL whose names contain the given "
+                  "patterns, e.g., 'LAGAB×…' for those with LAGAB as the outer "
+                  "sign, '…@g' for the gunû forms, or 'KA×(…)'.")
+  parser.add_argument("patterns", nargs="+", metavar="pattern")
+  parser.add_argument("--ogsl",
+                      default=os.path.join("..", "ogsl", "00lib", "ogsl.asl"),
+                      help="the ogsl.asl file of a checkout of the OGSL")
+  parser.add_argument("--no-cache", action="store_true",
+                      help="index the OGSL even if a cached index is up to "
+                           "date")
+  args = parser.parse_args()
+
+  # The fixups are meant for a given state of the OGSL; a search should not
+  # fail because they have drifted, nor show their notes.
+  diagnostics = Diagnostics(collect_all=True)
+  start = time.perf_counter()
+  with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+    index = load_index(args.ogsl, None if args.no_cache else CACHE_DIRECTORY,
+                       diagnostics)
+  print(f"Indexed {len(index.entries)} names in "
+        f"{time.perf_counter() - start:.3f} s" +
+        (f" ({len(diagnostics.diagnostics)} errors)" if diagnostics else ""),
+        file=sys.stderr)
+  for pattern in args.patterns:
+    start = time.perf_counter()
+    try:
+      results = index.search(pattern)
+    except ValueError as e:
+      parser.error(str(e))
+    print(f"{pattern}: {len(results)} results in "
+          f"{(time.perf_counter() - start) * 1e3:.1f} ms", file=sys.stderr)
+    for result in results:
+      print(f"{result.name}\t{result.encoding or ''}\t"
+            f"{' '.join(result.values)}")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,49 @@
+"""The snapshot of the dictionary, for tools that start often and need the
+whole dictionary.
+
+It holds the map from composition to sign and its reverse as a few long
+strings, so that loading it amounts to one decode and a few splits.  After
+SNAPSHOT_HEADER, it is the UTF-8 encoding of four NUL-separated sections:
+the compositions, the signs of the compositions, the distinct signs, and the
+compositions of each distinct sign; the lines of the sections are separated
+by LF, and the compositions of a sign by tabs.
+
+This module imports nothing, so that loading a snapshot costs only the
+reading of the file.
+"""
+SNAPSHOT = "sign_list.snapshot"
+SNAPSHOT_HEADER = b"Enmerkar snapshot 1\n"
+
+
+def format_snapshot(compositions):
+  """Returns the bytes of the snapshot of compositions, a map from composition
+  to sign."""
+  compositions = dict(sorted(compositions.items()))
+  compositions_by_sign = {}
+  for composition, sign in compositions.items():
+    compositions_by_sign.setdefault(sign, []).append(composition)
+  return SNAPSHOT_HEADER + "\0".join((
+      "\n".join(compositions),
+      "\n".join(compositions.values()),
+      "\n".join(compositions_by_sign),
+      "\n".join("\t".join(sign_compositions)
+                for sign_compositions in compositions_by_sign.values()),
+  )).encode("utf-8")
+
+
+def load_snapshot(path):
+  """Returns the map from composition to sign and the map from sign to the list
+  of its compositions, sorted, from a snapshot written by
+  dictionary.write_dictionary."""
+  with open(path, "rb") as f:
+    data = f.read()
+  if not data.startswith(SNAPSHOT_HEADER):
+    raise ValueError(f"{path} is not a snapshot ({SNAPSHOT_HEADER!r})")
+  compositions, signs, distinct_signs, compositions_by_sign = (
+      data[len(SNAPSHOT_HEADER):].decode("utf-8").split("\0"))
+  if not compositions:
+    return {}, {}
+  return (dict(zip(compositions.split("\n"), signs.split("\n"))),
+          dict(zip(distinct_signs.split("\n"),
+                   [sign_compositions.split("\t") for sign_compositions
+                    in compositions_by_sign.split("\n")])))
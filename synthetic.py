@@ -0,0 +1,313 @@
+"""Synthetic inputs for benchmarking the pipelines at scale.
+
+generate_asl and generate_sign_list_csv return the text of an OGSL .asl file
+and of a Šašková-style CSV respectively.  At scale 1 they are about the size of
+the real inputs; the records are drawn from the names of the signs in the
+Cuneiform block, so that they go through the same paths as real ones, but
+they are meaningless, and the fixups, Unicode name checks, and coverage check
+of the OGSL pipeline report errors about them.  The output is a deterministic
+function of the scale and the seed.
+
+generate_atf returns the text of an ATF file of formulaic transliterations
+drawn from the values of a dictionary, with Zipfian word frequencies, for the
+corpus tools.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import re
+import unicodedata
+
+import dictionary
+import homophones
+import numerals
+
+# The number of @sign records, and of rows of the CSV, at scale 1.  The real
+# OGSL has about as many signs; the real CSV has 1835 rows with readings.
+ASL_SIGNS = 3400
+CSV_ROWS = 1835
+
+CONSONANTS = "bdgptkzšsṣhmnrl"
+VOWELS = "aeiu"
+SUBSCRIPTS = "₀₁₂₃₄₅₆₇₈₉"
+DIGITS = str.maketrans(SUBSCRIPTS, "0123456789")
+
+# The number of ATF files, and of lines in each, at scale 1.
+ATF_FILES = 10
+ATF_LINES = 1000
+
+DETERMINATIVES = ("d", "m", "f", "giš", "ki", "lu₂", "uru", "kur")
+
+# The signs that sign_list.py and its row rules in sign_list_rows.py rewrite
+# or treat specially; the synthetic CSV avoids them so that every row goes
+# through the general path.
+SPECIAL_SIGNS = set()
+for module in ("sign_list.py", "sign_list_rows.py"):
+  with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), module),
+            encoding="utf-8-sig") as f:
+    SPECIAL_SIGNS.update(c for c in f.read() if 0x12000 <= ord(c) < 0x12550)
+
+
+def simple_signs():
+  """Returns the list of (codepoint, Unicode name) of the signs of the
+  Cuneiform block whose names are a single word, e.g., (𒀀, "A")."""
+  signs = []
+  for u in range(0x12000, 0x12400):
+    name = unicodedata.name(chr(u), "").replace("CUNEIFORM SIGN ", "")
+    if re.match(r"^[A-Z]+\d*$", name):
+      signs.append((chr(u), name))
+  return signs
+
+
+def subscript(n):
+  return "".join(SUBSCRIPTS[int(d)] for d in str(n))
+
+
+def ogsl_name(unicode_name):
+  """The OGSL name for a single word Unicode name, e.g., AŠ₂ for ASH2."""
+  letters, digits = re.match(r"^([A-Z]+)(\d*)$", unicode_name).groups()
+  return letters.replace("SH", "Š") + (subscript(digits) if digits else "")
+
+
+def syllables():
+  return ([c + v for c in CONSONANTS for v in VOWELS] +
+          [v + c for v in VOWELS for c in CONSONANTS] +
+          [c + v + d for c in CONSONANTS for v in VOWELS for d in CONSONANTS])
+
+
+class Values:
+  """Hands out values: each syllable with increasing indices, so that the
+  values with an index are unique, as they are in the sign lists, and those
+  with ₓ recur.  The units of the numerals are avoided, since both pipelines
+  check that 1meow and meow are the same sign."""
+
+  NUMERAL_UNITS = set(composition[1:]
+                      for composition in numerals.build_compositions()
+                      if re.match(r"^1\D", composition))
+
+  def __init__(self, rng):
+    self.rng = rng
+    self.syllables = syllables()
+    self.next_index = {}
+
+  def next(self, unique=True):
+    while True:
+      syllable = self.rng.choice(self.syllables)
+      if not unique:
+        return syllable + "ₓ"
+      index = self.next_index.get(syllable, 0)
+      self.next_index[syllable] = index + 1
+      value = syllable + (subscript(index + 1) if index else "")
+      if value.translate(DIGITS) not in self.NUMERAL_UNITS:
+        return value
+
+
+def compound(rng, signs, depth=0):
+  """Returns a (name, encoding) for a random compound of signs, such as
+  A.BA, A×(BA.DU), or (A&A).BA, without the enclosing pipes; encoding is None
+  if the compound is not a sequence of encoded signs."""
+  kind = rng.random()
+  if depth < 2 and kind < 0.15:
+    inner, _ = compound(rng, signs, depth + 1)
+    _, outer = rng.choice(signs)
+    return f"{ogsl_name(outer)}×({inner})", None
+  if depth < 2 and kind < 0.2:
+    a = ogsl_name(rng.choice(signs)[1])
+    b, _ = compound(rng, signs, depth + 1)
+    return f"({a}&{a}).{b}", None
+  parts = rng.sample(signs, rng.choice((2, 2, 2, 3)))
+  return (".".join(ogsl_name(name) for _, name in parts),
+          "".join(codepoint for codepoint, _ in parts))
+
+
+def generate_asl(scale=1, seed=0):
+  """Returns the text of a synthetic .asl file with scale times ASL_SIGNS
+  signs, with @list, @v, @ucun, @umap, and @form records.  It always has BAD
+  and IDIM, which the fixups modify unconditionally."""
+  rng = random.Random(seed)
+  signs = simple_signs()
+  values = Values(rng)
+  lines = ["# Synthetic OGSL, scale %s, seed %s." % (scale, seed)]
+  names = set()
+  encoded_names = []
+
+  def sign(name, encoding, umap=None):
+    names.add(name)
+    lines.append(f"@sign {name}")
+    for _ in range(rng.choice((0, 1, 1, 2))):
+      lines.append(f"@list MZL{rng.randrange(1, 1000 * scale):03}")
+    if encoding:
+      lines.append(f"@ucun {encoding}")
+      encoded_names.append(name)
+    elif umap:
+      lines.append(f"@umap {umap}")
+    for _ in range(rng.choice((1, 2, 3, 4, 6))):
+      value = values.next(unique=rng.random() < 0.9)
+      lines.append(f"@v %akk {value}" if rng.random() < 0.05 else f"@v {value}")
+    if rng.random() < 0.1:
+      lines.append(f"@v- {values.next(unique=False)}")
+    for _ in range(rng.choice((0, 0, 0, 1, 2))):
+      form, _ = compound(rng, signs)
+      form = f"|{form}|"
+      if form in names:
+        continue
+      names.add(form)
+      lines.append(f"@form {form}")
+      for _ in range(rng.choice((1, 2))):
+        lines.append(f"@v {values.next(unique=rng.random() < 0.7)}")
+    lines.append("@end sign")
+    lines.append("")
+
+  sign("BAD", "𒁁")
+  sign("IDIM", "𒁃")
+  for codepoint, name in signs:
+    if len(names) >= ASL_SIGNS * scale // 4:
+      break
+    if ogsl_name(name) not in names:
+      sign(ogsl_name(name), codepoint)
+  while len(names) < ASL_SIGNS * scale:
+    name, encoding = compound(rng, signs)
+    name = f"|{name}|"
+    if name in names:
+      continue
+    if encoding and rng.random() < 0.3:
+      encoding = None  # Left to the fixups to derive from the components.
+    umap = (rng.choice(encoded_names)
+            if not encoding and encoded_names and rng.random() < 0.05 else None)
+    sign(name, encoding if encoding and rng.random() < 0.9 else None, umap)
+  return "\n".join(lines) + "\n"
+
+
+def generate_sign_list_csv(scale=1, seed=0):
+  """Returns the text of a synthetic CSV in the format of the sign list of
+  Šašková with scale times CSV_ROWS rows.  A few readings are attributed to a
+  source, and homophones across signs are frequent, so that the
+  disambiguation has work to do."""
+  rng = random.Random(seed)
+  signs = [(codepoint, name) for codepoint, name in simple_signs()
+           if codepoint not in SPECIAL_SIGNS]
+  values = Values(rng)
+  used = set()
+  output = io.StringIO()
+  writer = csv.writer(output, lineterminator="\n")
+  meszl = 1000
+  while meszl - 1000 < CSV_ROWS * scale:
+    parts = rng.sample(signs, rng.choice((1, 1, 2, 2, 3)))
+    sign = "".join(codepoint for codepoint, _ in parts)
+    if sign in used:
+      continue
+    used.add(sign)
+    meszl += 1
+    readings = []
+    for _ in range(rng.choice((1, 2, 3, 5, 8))):
+      value = values.next(unique=rng.random() < 0.8)
+      value = value.replace("ₓ", "x").translate(DIGITS).upper()
+      if value in (reading.split(" ")[0] for reading in readings):
+        continue
+      if rng.random() < 0.1:
+        value += " (MesZL: also %s)" % ".".join(name for _, name in parts)
+      readings.append(value)
+    writer.writerow([
+        sign, sign,
+        "%s\n(%s)\n(ePSD; Akkadian Dictionary)" % (
+            ".".join(name for _, name in parts), ", ".join(readings)),
+        str(meszl), str(meszl),
+        "%s\n(%s)" % (" & ".join("U+%X" % ord(c) for c, _ in parts),
+                      " & ".join(name for _, name in parts))])
+  writer.writerow([""] * 6)
+  return output.getvalue()
+
+
+def atf_spelling(composition):
+  """The ATF spelling of a value composition, e.g., du₃ for du3."""
+  return re.sub(r"\d+$", lambda m: subscript(m[0]),
+                composition).replace("x", "ₓ")
+
+
+def atf_vocabulary(compositions, rng, size=5000):
+  """Returns a list of size words built from the values of compositions, in
+  decreasing order of frequency."""
+  values = sorted(set(
+      composition for composition in compositions
+      if (homophones.split_composition(composition) or ("", "", "v"))[2] == ""))
+  # A few hundred short syllables make up most of a real text.
+  short = [value for value in values if len(value.rstrip("0123456789")) <= 3]
+  common = rng.sample(short, min(300, len(short)))
+  words = []
+  while len(words) < size:
+    pool = common if rng.random() < 0.9 else values
+    signs = [atf_spelling(rng.choice(pool))
+             for _ in range(rng.choice((1, 1, 2, 2, 2, 3, 3, 4)))]
+    word = "-".join(signs)
+    if rng.random() < 0.15:
+      word = "{%s}%s" % (rng.choice(DETERMINATIVES), word)
+    words.append(word)
+  return words
+
+
+def generate_atf(compositions, lines=ATF_LINES, seed=0, number=1):
+  """Returns the text of a synthetic ATF file, the text P<number>, with about
+  the given number of transliteration lines, whose words are drawn from the
+  values of compositions, a map from composition to sign, with a Zipfian
+  distribution, with numbers, broken signs, and flags."""
+  rng = random.Random(seed)
+  vocabulary = atf_vocabulary(compositions, random.Random(seed))
+  weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+  rng.seed(f"{seed} {number}")
+  output = [f"&P{number:06} = Synthetic {number}", "#atf: lang akk",
+            "@tablet", "@obverse"]
+  for line in range(1, lines + 1):
+    if line == lines // 2:
+      output += ["$ rest of obverse broken", "@reverse"]
+    words = rng.choices(vocabulary, weights, k=rng.randint(2, 7))
+    if rng.random() < 0.2:
+      words.insert(0, f"{rng.randint(1, 9)}(diš)")
+    if rng.random() < 0.1:
+      words[-1] = f"[{words[-1]}]"
+    if rng.random() < 0.1:
+      words[0] += "#"
+    if rng.random() < 0.05:
+      words.append("x")
+    output.append(f"{line}. " + " ".join(words))
+    if rng.random() < 0.02:
+      output.append("#note: synthetic")
+  return "\n".join(output) + "\n"
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Writes synthetic OGSL and Šašková inputs at the given "
+                  "scales, as synthetic.<scale>.asl and "
+                  "synthetic.<scale>.csv, and optionally an ATF corpus.")
+  parser.add_argument("scales", nargs="*", type=int, default=[1, 10, 100])
+  parser.add_argument("-o", "--output-directory", default="synthetic")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--atf", metavar="DICTIONARY",
+                      help="also write scale times %d ATF files with values "
+                           "from DICTIONARY to synthetic.<scale>.atf" % ATF_FILES)
+  args = parser.parse_args()
+
+  os.makedirs(args.output_directory, exist_ok=True)
+  for scale in args.scales:
+    for extension, generate in (("asl", generate_asl),
+                                ("csv", generate_sign_list_csv)):
+      path = os.path.join(args.output_directory,
+                          f"synthetic.{scale}.{extension}")
+      with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(generate(scale, args.seed))
+      print(f"{path}: {os.path.getsize(path)} bytes")
+    if args.atf:
+      compositions = dictionary.read_dictionary(args.atf)
+      directory = os.path.join(args.output_directory, f"synthetic.{scale}.atf")
+      os.makedirs(directory, exist_ok=True)
+      for number in range(1, ATF_FILES * scale + 1):
+        with open(os.path.join(directory, f"P{number:06}.atf"), "w",
+                  encoding="utf-8") as f:
+          f.write(generate_atf(compositions, seed=args.seed, number=number))
+      print(f"{directory}: {ATF_FILES * scale} files")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,187 @@
+import concurrent.futures
+import multiprocessing
+import os
+import sys
+import time
+
+import build
+import dictionary
+import snapshot
+from diagnostics import Diagnostics
+
+# The stages that write a dictionary, and the setting giving its directory.
+DICTIONARY_STAGES = {
+    "ogsl_dictionary": "ogsl_output_directory",
+    "sign_list_dictionary": "sign_list_output_directory",
+    "reconciliation": "reconciled_output_directory",
+}
+
+
+def watched_paths(targets, config):
+  """Returns the inputs and the code of the stages needed for targets, i.e.,
+  the files on which the keys of their cached results depend."""
+  paths = set()
+  for name in build.required_stages(targets):
+    stage = build.STAGES[name]
+    paths.update(stage.inputs(config))
+    paths.update(sys.modules[module].__file__ for module in stage.modules)
+  return sorted(paths)
+
+
+def file_state(path):
+  try:
+    status = os.stat(path)
+  except FileNotFoundError:
+    return None
+  return status.st_mtime_ns, status.st_size
+
+
+def read_dictionaries(targets, config):
+  """Returns the compositions currently in the dictionaries written by
+  targets, by stage, from their snapshots."""
+  dictionaries = {}
+  for name in build.required_stages(targets):
+    if name in DICTIONARY_STAGES:
+      path = os.path.join(getattr(config, DICTIONARY_STAGES[name]),
+                          snapshot.SNAPSHOT)
+      try:
+        dictionaries[name] = dictionary.read_dictionary(path)
+      except (OSError, ValueError):
+        dictionaries[name] = {}
+  return dictionaries
+
+
+def describe_changes(old, new, limit=10):
+  """Returns lines describing the compositions added, removed, and changed
+  from old to new, giving at most limit of each."""
+  added = sorted(composition for composition in new if composition not in old)
+  removed = sorted(composition for composition in old if composition not in new)
+  changed = sorted(composition for composition in new
+                   if composition in old and old[composition] != new[composition])
+  lines = []
+  for label, compositions, describe in (
+      ("added", added, lambda c: f"{c}={new[c]}"),
+      ("removed", removed, lambda c: f"{c}={old[c]}"),
+      ("changed", changed, lambda c: f"{c}={old[c]}→{new[c]}")):
+    if compositions:
+      lines.append(f"  {len(compositions)} {label}: " +
+                   ", ".join(map(describe, compositions[:limit])) +
+                   (", …" if len(compositions) > limit else ""))
+  return lines
+
+
+def rebuild(targets, config, collect_all, jobs):
+  """Runs the build and returns its diagnostics and the map from the paths
+  written by the stages which succeeded to the SHA-256 of their contents.
+  This runs in a freshly spawned process, so that it uses the code of the
+  rules as it is on disk."""
+  diagnostics = Diagnostics(collect_all=collect_all)
+  written = {}
+  try:
+    results = build.build(targets, config, diagnostics, jobs=jobs,
+                          cache_directory=(None if config.no_cache else
+                                           build.CACHE_DIRECTORY))
+  except Exception as e:
+    diagnostics.collect_all = True
+    diagnostics.error(type(e).__name__, e)
+  else:
+    for name, result in results.items():
+      if build.STAGES[name].writes:
+        written.update(result)
+  return diagnostics.diagnostics, written
+
+
+def rebuild_and_log(targets, config, digests, log=sys.stderr):
+  """Rebuilds targets, and logs the compositions that changed in the
+  dictionaries, and the other outputs that changed, even if some stages
+  failed, since those which succeeded have replaced their outputs.  digests
+  maps the outputs to the SHA-256 of their contents as of the previous
+  build, and is updated."""
+  before = read_dictionaries(targets, config)
+  start = time.perf_counter()
+  with concurrent.futures.ProcessPoolExecutor(
+      1, mp_context=multiprocessing.get_context("spawn")) as executor:
+    diagnostics = Diagnostics()
+    diagnostics.diagnostics, written = executor.submit(
+        rebuild, targets, config, config.all_errors, config.jobs or None
+    ).result()
+  after = read_dictionaries(targets, config)
+  changed = False
+  for name in after:
+    lines = describe_changes(before[name], after[name])
+    changed = changed or bool(lines)
+    print(f"{name}:" if lines else f"{name}: no changes", file=log)
+    for line in lines:
+      print(line, file=log)
+  # A stage that fails may abort the build, leaving written incomplete, so
+  # the outputs known from earlier builds are checked as well.
+  current = {path: build.file_digest(path) for path in digests
+             if os.path.exists(path)}
+  current.update(written)
+  outputs = sorted(path for path, digest in current.items()
+                   if digests.get(path) != digest)
+  if outputs:
+    changed = True
+    print("outputs changed: " + ", ".join(outputs), file=log)
+  digests.update(current)
+  if diagnostics:
+    diagnostics.report(file=log)
+    print(f"Build failed in {time.perf_counter() - start:.2f} s; " +
+          ("the stages which succeeded changed the outputs above." if changed
+           else "the outputs are unchanged."), file=log)
+    return
+  print(f"Built in {time.perf_counter() - start:.2f} s.", file=log)
+
+
+def watched_states(targets, config):
+  """Returns the state of each of the watched paths, listed anew, so that the
+  files added to a corpus are watched."""
+  return {path: file_state(path) for path in watched_paths(targets, config)}
+
+
+def main():
+  parser = build.argument_parser()
+  parser.description = (
+      "Builds the dictionaries, then rebuilds them whenever the inputs or the "
+      "code of the stages change, logging the compositions that changed.  "
+      "Only the stages affected by a change run again, and each dictionary is "
+      "replaced atomically, so that an input method never reads a partial "
+      "one.  The stages are " + ", ".join(build.STAGES) + ".")
+  parser.add_argument("--interval", type=float, default=0.2,
+                      help="seconds between checks of the watched files")
+  args = parser.parse_args()
+  for target in args.targets:
+    if target not in build.STAGES:
+      parser.error(f"unknown stage {target}")
+  targets = args.targets or list(build.STAGES)
+
+  states = watched_states(targets, args)
+  print("Watching " + ", ".join(states), file=sys.stderr)
+  digests = {}
+  rebuild_and_log(targets, args, digests)
+  try:
+    while True:
+      time.sleep(args.interval)
+      if watched_states(targets, args) == states:
+        continue
+      # Editors often write a file in several steps; wait until the files
+      # stop changing.
+      while True:
+        current = watched_states(targets, args)
+        time.sleep(args.interval)
+        if current == watched_states(targets, args):
+          break
+      changed = sorted(path for path in set(current) | set(states)
+                       if current.get(path) != states.get(path))
+      states = current
+      if not changed:
+        continue
+      print(f"\n{time.strftime('%H:%M:%S')} changed: " + ", ".join(changed),
+            file=sys.stderr)
+      rebuild_and_log(targets, args, digests)
+  except KeyboardInterrupt:
+    pass
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,161 @@
+"""Entry of whole transliterated words, such as an-na-ku or {d}utu, which are
+converted to signs in one step, rather than one sign at a time as the input
+method does; this is the reference implementation of such a mode.
+
+A word is split into its signs as the words of an ATF file are (see atf.py),
+so that the separators - and ., determinatives in braces, subscript or ASCII
+indices, and numbers such as 3(diš) are all accepted.  Each segment is resolved
+through the compositions of the dictionary: a segment which is a composition
+gives its sign; one which is a value whose compositions are disambiguated, as
+dux is by duxv1, duxv2, …, gives the first of those in the order of the input
+method (or by the frequencies of a corpus, see corpus_frequencies.py), and is
+reported as ambiguous; any other segment is unknown, and is left as it was
+typed.
+
+The segmentations of the words are memoized in an LRU cache, since the same
+words recur constantly in a text.
+"""
+import argparse
+import collections
+import functools
+import os
+import sys
+import time
+
+import atf
+import collation
+import corpus_frequencies
+import dictionary
+import reconcile
+
+# The number of words whose segmentation is memoized.
+CACHE_SIZE = 1 << 14
+
+Segment = collections.namedtuple(
+    "Segment", ("reading", "composition", "sign", "candidates"))
+Segment.__doc__ = """A sign of a word: its reading, as typed and normalized,
+the composition by which it was resolved and its sign, both None if the reading
+is unknown, and the number of compositions of which it could be the value."""
+
+Segmentation = collections.namedtuple("Segmentation",
+                                      ("word", "text", "segments"))
+Segmentation.__doc__ = """The conversion of word: its text, with the signs of
+its segments, and the tuple of its Segments."""
+
+
+class WordConverter:
+  """Converts words with compositions, a map from composition to sign, ordering
+  the candidates of a reading by key, the order of the input method by default.
+  The segmentations of the last cache_size words are memoized; cache_size may
+  be 0."""
+
+  def __init__(self, compositions, key=collation.collation_key,
+               cache_size=CACHE_SIZE):
+    self.compositions = compositions
+    self.candidates_by_value = reconcile.disambiguated_values(compositions)
+    for candidates in self.candidates_by_value.values():
+      candidates.sort(key=key)
+    self.convert = (functools.lru_cache(maxsize=cache_size)(self._convert)
+                    if cache_size else self._convert)
+
+  def resolve(self, reading):
+    """Returns the Segment for reading."""
+    if reading in self.compositions:
+      return Segment(reading, reading, self.compositions[reading], 1)
+    candidates = self.candidates_by_value.get(reading)
+    if candidates:
+      return Segment(reading, candidates[0],
+                     self.compositions[candidates[0]], len(candidates))
+    return Segment(reading, None, None, 0)
+
+  def _convert(self, word):
+    segments = []
+    for reading, _ in atf.sign_readings(word):
+      segments.append(self.resolve("x" if reading is None else reading))
+    return Segmentation(
+        word, "".join(segment.sign or segment.reading for segment in segments),
+        tuple(segments))
+
+  def convert_text(self, text):
+    """Returns the text with each of its words, separated by whitespace,
+    converted."""
+    return "\n".join(" ".join(self.convert(word).text for word in line.split())
+                     for line in text.split("\n"))
+
+
+def benchmark(compositions, words, cache_size=CACHE_SIZE, repeat=3):
+  """Returns the words converted per second with the given cache size, and the
+  cache hit rate."""
+  best = None
+  for _ in range(repeat):
+    converter = WordConverter(compositions, cache_size=cache_size)
+    start = time.perf_counter()
+    for word in words:
+      converter.convert(word)
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+  info = converter.convert.cache_info() if cache_size else None
+  return (len(words) / best,
+          info.hits / (info.hits + info.misses) if info else 0)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Converts the transliterated words of the given files, or "
+                  "of the standard input, to signs, reporting the unknown and "
+                  "ambiguous readings on the standard error; or measures the "
+                  "throughput of the conversion of the words of ATF files.")
+  parser.add_argument("paths", nargs="*", metavar="path")
+  parser.add_argument("--dictionary",
+                      default=os.path.join("Samples", "IME", "cpp",
+                                           "SampleIME", "Dictionary",
+                                           "sign_list.txt"),
+                      help="the dictionary, in any of its formats")
+  parser.add_argument("--frequencies",
+                      help="rank the candidates of ambiguous readings by the "
+                           "frequencies in this file, written by build.py")
+  parser.add_argument("--benchmark", action="store_true",
+                      help="measure the conversion of the words of the ATF "
+                           "files in paths, files or directories")
+  parser.add_argument("--cache-size", type=int, default=CACHE_SIZE,
+                      help="the number of words whose segmentation is "
+                           "memoized")
+  args = parser.parse_args()
+
+  compositions = dictionary.read_dictionary(args.dictionary)
+  if args.benchmark:
+    words = [word for path in atf.atf_files(args.paths)
+             for _, word, _ in atf.read_words(path)]
+    signs = sum(len(tuple(atf.sign_readings(word))) for word in set(words))
+    print(f"{len(words)} words, {len(set(words))} distinct, "
+          f"{signs} signs in the distinct words")
+    print(f"{'cache size':>10}{'words/s':>12}{'hit rate':>10}")
+    for cache_size in sorted({0, args.cache_size}):
+      throughput, hit_rate = benchmark(compositions, words, cache_size)
+      print(f"{cache_size:>10}{throughput:>12.0f}{hit_rate:>10.1%}")
+    return
+
+  key = (corpus_frequencies.ranking_key(
+      "tiebreak", corpus_frequencies.read_frequencies(args.frequencies))
+         if args.frequencies else collation.collation_key)
+  converter = WordConverter(compositions, key, args.cache_size)
+  reported = set()
+  for path in args.paths or ["-"]:
+    with (open(path, encoding="utf-8") if path != "-" else sys.stdin) as f:
+      for line in f:
+        segmentations = [converter.convert(word) for word in line.split()]
+        print(" ".join(segmentation.text for segmentation in segmentations))
+        for segmentation in segmentations:
+          for segment in segmentation.segments:
+            if segment.candidates == 1 or segment.reading in reported:
+              continue
+            reported.add(segment.reading)
+            if segment.composition is None:
+              print(f"{segment.reading}: unknown reading", file=sys.stderr)
+            else:
+              print(f"{segment.reading}: {segment.candidates} candidates, "
+                    f"chose {segment.composition}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+  main()